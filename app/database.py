@@ -1,11 +1,31 @@
+from flask import g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.model import Model
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.types import TypeDecorator, CHAR
 import uuid
 
-db = SQLAlchemy()
+class DomainAwareQueryProperty:
+    """Class property returning a query bound to the request's domain session"""
+    
+    def __get__(self, obj, cls):
+        return cls.get_session().query(cls)
+
+class DomainAwareModel(Model):
+    """Base for db.Model that routes queries to the domain-specific session when one is set"""
+    
+    @classmethod
+    def get_session(cls):
+        """Return the domain-specific session for this request, otherwise the default one"""
+        session = getattr(g, 'db_session', None) if has_request_context() else None
+        return session if session is not None else db.session
+
+db = SQLAlchemy(model_class=DomainAwareModel)
+# SQLAlchemy() sets its own query property on the generated db.Model, which would
+# shadow one declared on DomainAwareModel, so the domain-aware one is assigned here
+db.Model.query = DomainAwareQueryProperty()
 
 class GUID(TypeDecorator):
     """Platform-independent GUID type.
@@ -64,6 +84,11 @@ def clear_current_user():
 
 def init_db(app):
     """Initialize the database"""
+    # Validate pooled connections at checkout instead of probing them per request
+    engine_options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    engine_options.setdefault('pool_pre_ping', True)
+    engine_options.setdefault('pool_recycle', 1800)
+    
     db.init_app(app)
     
     # Create tables if they don't exist
@@ -1716,20 +1716,12 @@ def upload_profiles():
             if not profiles:
                 return jsonify({'success': False, 'error': 'No valid profiles found in the uploaded file'}), 400
             
-            # Create profiles in database
-            created_count = 0
-            for profile_data in profiles:
-                try:
-                    # Add email_id and request_id to profile data
-                    profile_data['email_id'] = f"upload_{request_id}_{created_count}"
-                    
-                    # Create profile using existing logic
-                    profile = email_processor._create_or_update_profile(profile_data, f"upload_{request_id}")
-                    if profile:
-                        created_count += 1
-                except Exception as e:
-                    current_app.logger.error(f"Error creating profile: {str(e)}")
-                    continue
+            # Add email_id and request_id to profile data
+            for index, profile_data in enumerate(profiles):
+                profile_data['email_id'] = f"upload_{request_id}_{index}"
+            
+            # Create profiles in database with a single duplicate lookup and commit
+            created_count = len(email_processor._create_or_update_profiles(profiles, f"upload_{request_id}"))
             
             # Clean up temporary file
             os.remove(temp_path)
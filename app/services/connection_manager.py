@@ -159,6 +159,10 @@ class DatabaseConnectionManager:
     def get_active_domains(self) -> list:
         """Get list of domains with active connections"""
         return list(self._engines.keys())
+    
+    def is_domain_active(self, domain: str) -> bool:
+        """Check if a domain has an active connection without building the domain list"""
+        return domain in self._engines
 
 # Global connection manager instance
 connection_manager = DatabaseConnectionManager()
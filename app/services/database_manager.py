@@ -1,12 +1,27 @@
+import functools
 import logging
-from typing import Dict, Optional, Any
-from flask import current_app, request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Set, Tuple
+from flask import current_app, request, g, has_request_context
+from app.database import db
+from app.models.user import User
 from app.services.connection_manager import connection_manager, set_db_session_for_domain
 from app.services.redis_domain_cache_service import enhanced_domain_cache_service
 from app.services.external_api_client import ExternalEnvironmentAPIClient
 
 logger = logging.getLogger(__name__)
 
+_LOCALHOST = frozenset({'localhost', '127.0.0.1', '[::1]'})
+
+def _is_localhost(domain: str) -> bool:
+    """Check whether a Host-style domain (optionally with port) points at localhost"""
+    if domain.startswith('['):
+        # Bracketed IPv6 literal, e.g. '[::1]:3000'
+        host = domain[:domain.find(']') + 1]
+    else:
+        host = domain.partition(':')[0]
+    return host.lower() in _LOCALHOST
+
 class DatabaseManager:
     """Manages domain-to-database mapping and switching for domain isolation"""
     
@@ -20,9 +35,41 @@ class DatabaseManager:
             'localhost:3000': 'rigvedit_dev',
             '127.0.0.1:3000': 'rigvedit_dev'
         }
+        self._localhost_creds_cache = {}
+        self._trust_x_domain_headers = True
+        # Memoized per raw Host string; cleared whenever the mappings change
+        self._resolve_domain = functools.lru_cache(maxsize=1024)(self._resolve_domain_uncached)
+        self._rebuild_domain_lookup()
+    
+    def _rebuild_domain_lookup(self):
+        """Rebuild the normalized lookup holding both port-qualified and host-only keys"""
+        host_only = {domain.partition(':')[0]: db_name for domain, db_name in self._domain_mappings.items()}
+        # Explicit mappings take precedence over derived host-only keys
+        self._domain_mappings_norm = {**host_only, **self._domain_mappings}
+        self._resolve_domain.cache_clear()
+    
+    def _resolve_domain_uncached(self, domain: str) -> Tuple[Optional[str], bool]:
+        """
+        Resolve a domain to its database name and localhost flag
+        
+        Args:
+            domain: Domain identifier
+            
+        Returns:
+            Tuple of (database name or None, whether the domain is localhost)
+        """
+        host = domain.partition(':')[0]
+        db_name = self._domain_mappings_norm.get(domain) or self._domain_mappings_norm.get(host)
+        return db_name, _is_localhost(domain)
         
     def init_app(self, app):
         """Initialize the database manager with Flask app"""
+        # Config may differ per app; drop any memoized localhost credentials
+        self._localhost_creds_cache.clear()
+        
+        # Production deployments that don't proxy through the frontend can skip the X-* headers
+        self._trust_x_domain_headers = app.config.get('TRUST_X_DOMAIN_HEADERS', True)
+        
         # Initialize API client if external API URL is provided
         external_api_base_url = app.config.get('EXTERNAL_API_BASE_URL')
         external_api_timeout = app.config.get('EXTERNAL_API_TIMEOUT', 30)
@@ -33,9 +80,37 @@ class DatabaseManager:
                 timeout=external_api_timeout
             )
             logger.info("Database manager initialized with external API client")
+            
+            if app.config.get('PREFETCH_DOMAIN_CREDS', True):
+                self._prefetch_domain_credentials(app)
         else:
             logger.info("Database manager initialized in localhost mode")
     
+    def _prefetch_domain_credentials(self, app):
+        """
+        Warm the credential caches for all known non-localhost domains in the background
+        
+        Args:
+            app: Flask application whose config the lookups should use
+        """
+        domains = [domain for domain in self._domain_mappings if not self._resolve_domain(domain)[1]]
+        if not domains:
+            return
+        
+        def warm(domain):
+            try:
+                with app.app_context():
+                    self.get_database_credentials_for_domain(domain)
+            except Exception as e:
+                logger.warning(f"Failed to prefetch credentials for domain {domain}: {str(e)}")
+        
+        executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='domain-creds-prefetch')
+        for domain in domains:
+            executor.submit(warm, domain)
+        # Let the workers finish in the background without blocking startup
+        executor.shutdown(wait=False)
+        logger.info(f"Prefetching database credentials for {len(domains)} domains")
+    
     def get_domain_from_request(self) -> str:
         """
         Extract domain from the current request
@@ -43,17 +118,26 @@ class DatabaseManager:
         Returns:
             Domain string (e.g., 'rgvdit-rops.rigvedtech.com:3000')
         """
-        # Check for custom domain header first (from frontend)
-        domain = request.headers.get('X-Original-Domain')
-        if domain:
-            logger.debug(f"Extracted domain from X-Original-Domain header: {domain}")
-            return domain
-        
-        # Check for alternative domain header
-        domain = request.headers.get('X-Domain')
-        if domain:
-            logger.debug(f"Extracted domain from X-Domain header: {domain}")
-            return domain
+        # Headers don't change during a request; resolve them only once
+        cached = getattr(g, '_request_domain', None)
+        if cached:
+            return cached
+        
+        # Custom domain headers are only honoured when the frontend proxy is trusted
+        if self._trust_x_domain_headers:
+            # Check for custom domain header first (from frontend)
+            domain = request.headers.get('X-Original-Domain')
+            if domain:
+                logger.debug(f"Extracted domain from X-Original-Domain header: {domain}")
+                g._request_domain = domain
+                return domain
+            
+            # Check for alternative domain header
+            domain = request.headers.get('X-Domain')
+            if domain:
+                logger.debug(f"Extracted domain from X-Domain header: {domain}")
+                g._request_domain = domain
+                return domain
         
         # Fallback to Host header
         host = request.headers.get('Host', '')
@@ -64,6 +148,7 @@ class DatabaseManager:
                 host = f"{host}:{request.port}"
         
         logger.debug(f"Extracted domain from Host header: {host}")
+        g._request_domain = host
         return host
     
     def get_database_name_for_domain(self, domain: str) -> Optional[str]:
@@ -76,17 +161,10 @@ class DatabaseManager:
         Returns:
             Database name or None if not found
         """
-        # Check if domain has a direct mapping
-        if domain in self._domain_mappings:
-            db_name = self._domain_mappings[domain]
-            logger.info(f"Found direct mapping for domain {domain} -> {db_name}")
-            return db_name
-        
-        # Try to extract domain without port for mapping
-        domain_without_port = domain.split(':')[0]
-        if domain_without_port in self._domain_mappings:
-            db_name = self._domain_mappings[domain_without_port]
-            logger.info(f"Found mapping for domain {domain_without_port} -> {db_name}")
+        # Direct mapping first, then the same domain without its port
+        db_name = self._resolve_domain(domain)[0]
+        if db_name:
+            logger.info(f"Found mapping for domain {domain} -> {db_name}")
             return db_name
         
         logger.warning(f"No database mapping found for domain: {domain}")
@@ -103,18 +181,17 @@ class DatabaseManager:
             PostgreSQL credentials dictionary or None if not found
         """
         # Handle localhost domains - return credentials from .env config
-        from urllib.parse import urlparse
-        try:
-            parsed = urlparse(f"http://{domain}")
-            hostname = (parsed.hostname or '').lower()
-            is_localhost = hostname in ['localhost', '127.0.0.1']
-        except Exception:
-            is_localhost = False
+        is_localhost = self._resolve_domain(domain)[1]
         
         if is_localhost:
             logger.info(f"Localhost domain detected: {domain}, using .env database credentials")
             # For localhost, return credentials from Flask app config (.env)
             try:
+                app_id = id(current_app._get_current_object())
+                cached_creds = self._localhost_creds_cache.get(app_id)
+                if cached_creds is not None:
+                    return cached_creds
+                
                 postgres_creds = {
                     'POSTGRES_HOST': current_app.config.get('DB_HOST'),
                     'POSTGRES_PORT': current_app.config.get('DB_PORT'),
@@ -131,6 +208,7 @@ class DatabaseManager:
                     logger.error(f"Missing database credentials in .env for localhost: {missing_keys}")
                     return None
                 
+                self._localhost_creds_cache[app_id] = postgres_creds
                 logger.info(f"Using .env credentials for localhost domain: {domain}")
                 return postgres_creds
                 
@@ -177,6 +255,11 @@ class DatabaseManager:
             True if database switch was successful, False otherwise
         """
         try:
+            # Session for this domain is already bound to the request - nothing to do
+            if self._has_domain_session(domain):
+                logger.debug(f"Database session already active for domain: {domain}")
+                return True
+            
             # Get database credentials for domain
             postgres_creds = self.get_database_credentials_for_domain(domain)
             if not postgres_creds:
@@ -211,29 +294,18 @@ class DatabaseManager:
                 return False
             
             # Check if we already have the correct database session
-            from flask import g
             if hasattr(g, 'domain') and g.domain == domain:
                 logger.debug(f"Database session already set for domain: {domain}")
                 return True
             
             # Handle localhost domains - use default SQLAlchemy config instead of external credentials
-            from urllib.parse import urlparse
-            try:
-                parsed = urlparse(f"http://{domain}")
-                hostname = (parsed.hostname or '').lower()
-                is_localhost = hostname in ['localhost', '127.0.0.1']
-            except Exception:
-                is_localhost = False
-            
-            if is_localhost:
+            if self._resolve_domain(domain)[1]:
                 logger.info(f"Localhost domain detected: {domain}, using default SQLAlchemy configuration")
                 # For localhost, use the default database session from Flask-SQLAlchemy
                 # This bypasses the domain-specific database switching
-                from app.database import db
                 try:
-                    # Test the default connection
+                    # Connection liveness is checked by the pool at checkout (pool_pre_ping)
                     session = db.session
-                    session.execute("SELECT 1")
                     # Set the session in g context for consistency
                     g.db_session = session
                     g.domain = domain
@@ -263,18 +335,10 @@ class DatabaseManager:
         """
         try:
             # Ensure we're using the correct database for this domain
-            if not self.switch_to_domain_database(domain):
-                logger.error(f"Could not switch to database for domain: {domain}")
-                return False
-            
-            # Check if user exists in the domain's database
-            from flask import g
-            if not hasattr(g, 'db_session') or g.db_session is None:
-                logger.error("No database session available for user validation")
+            if not self._ensure_domain_session(domain):
                 return False
             
             # Query user in domain-specific database - only check if exists
-            from app.models.user import User
             user_exists = g.db_session.query(User.user_id).filter_by(username=username).first() is not None
             
             if user_exists:
@@ -288,6 +352,59 @@ class DatabaseManager:
             logger.error(f"Error validating user {username} for domain {domain}: {str(e)}")
             return False
     
+    def validate_users_belong_to_domain(self, usernames: List[str], domain: str) -> Set[str]:
+        """
+        Validate several users against the domain's database in a single query
+        
+        Args:
+            usernames: Usernames to validate
+            domain: Domain identifier
+            
+        Returns:
+            Set of the given usernames that exist in the domain's database
+        """
+        if not usernames:
+            return set()
+        
+        try:
+            if not self._ensure_domain_session(domain):
+                return set()
+            
+            rows = g.db_session.query(User.username).filter(User.username.in_(set(usernames))).all()
+            found = {row.username for row in rows}
+            
+            logger.info(f"Found {len(found)} of {len(usernames)} users in domain {domain} database")
+            return found
+            
+        except Exception as e:
+            logger.error(f"Error validating users for domain {domain}: {str(e)}")
+            return set()
+    
+    def _has_domain_session(self, domain: str) -> bool:
+        """Check whether the current request already holds a session for the domain"""
+        return (has_request_context() and getattr(g, 'domain', None) == domain
+                and getattr(g, 'db_session', None) is not None)
+    
+    def _ensure_domain_session(self, domain: str) -> bool:
+        """
+        Make sure the request has a live session bound to the given domain
+        
+        Args:
+            domain: Domain identifier
+            
+        Returns:
+            True if a session for the domain is available, False otherwise
+        """
+        if not self.switch_to_domain_database(domain):
+            logger.error(f"Could not switch to database for domain: {domain}")
+            return False
+        
+        if getattr(g, 'db_session', None) is None:
+            logger.error("No database session available for user validation")
+            return False
+        
+        return True
+    
     def get_domain_info(self, domain: str) -> Dict[str, Any]:
         """
         Get information about a domain's database configuration
@@ -298,14 +415,47 @@ class DatabaseManager:
         Returns:
             Dictionary with domain information
         """
+        # Localhost credentials come from .env; otherwise only check the cache, don't fetch
+        if self._resolve_domain(domain)[1]:
+            has_credentials = self.get_database_credentials_for_domain(domain) is not None
+        else:
+            has_credentials = self.cache_service.has_credentials(domain)
+        
+        return self._build_domain_info(domain, has_credentials)
+    
+    def get_all_domain_info(self) -> List[Dict[str, Any]]:
+        """
+        Get database configuration information for every mapped domain
+        
+        Cached credentials for all non-localhost domains are fetched in one bulk
+        lookup instead of one cache round-trip per domain.
+        
+        Returns:
+            List of domain information dictionaries
+        """
+        domains = list(self._domain_mappings)
+        remote_domains = [domain for domain in domains if not self._resolve_domain(domain)[1]]
+        cached = self.cache_service.get_credentials_bulk(remote_domains)
+        
+        domain_info = []
+        for domain in domains:
+            if domain in cached:
+                has_credentials = cached[domain] is not None
+            else:
+                has_credentials = self.get_database_credentials_for_domain(domain) is not None
+            domain_info.append(self._build_domain_info(domain, has_credentials))
+        
+        return domain_info
+    
+    def _build_domain_info(self, domain: str, has_credentials: bool) -> Dict[str, Any]:
+        """Assemble the domain information dictionary"""
         db_name = self.get_database_name_for_domain(domain)
-        credentials = self.get_database_credentials_for_domain(domain)
         
         return {
             'domain': domain,
             'database_name': db_name,
-            'has_credentials': credentials is not None,
-            'has_active_connection': domain in connection_manager.get_active_domains()
+            'has_credentials': has_credentials,
+            'has_active_connection': connection_manager.is_domain_active(domain)
         }
     
     def add_domain_mapping(self, domain: str, database_name: str):
@@ -317,6 +467,7 @@ class DatabaseManager:
             database_name: Database name
         """
         self._domain_mappings[domain] = database_name
+        self._rebuild_domain_lookup()
         logger.info(f"Added domain mapping: {domain} -> {database_name}")
     
     def remove_domain_mapping(self, domain: str):
@@ -328,6 +479,7 @@ class DatabaseManager:
         """
         if domain in self._domain_mappings:
             del self._domain_mappings[domain]
+            self._rebuild_domain_lookup()
             logger.info(f"Removed domain mapping: {domain}")
     
     def get_all_domain_mappings(self) -> Dict[str, str]:
@@ -3,14 +3,24 @@ Decryption service for handling encrypted environment variables from external AP
 This implements the same AES-256-CBC decryption as client-decryption.js
 """
 
-import base64
 import logging
+import re
+from binascii import a2b_base64
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 from typing import Dict, Any, Optional
 
+try:
+    # PyCryptodome's AES is a thin wrapper over AES-NI; preferred for short env values
+    from Crypto.Cipher import AES
+except ImportError:
+    AES = None
+
 logger = logging.getLogger(__name__)
 
+# "IV:encrypted_data" where the IV is 16 bytes (24 base64 chars) and the ciphertext is at least one block
+_ENCRYPTED_VALUE_RE = re.compile(r'^[A-Za-z0-9+/]{22,24}={0,2}:[A-Za-z0-9+/]{20,}={0,2}$')
+
 class DecryptionService:
     """Service for decrypting environment variables using AES-256-CBC"""
     
@@ -22,6 +32,7 @@ class DecryptionService:
             encryption_key: The encryption key (same as ENCRYPTION_SECRET_KEY)
         """
         self.encryption_key = encryption_key
+        self._prepared_key = self._prepare_key(encryption_key)
     
     def _prepare_key(self, key: str) -> bytes:
         """
@@ -53,10 +64,23 @@ class DecryptionService:
         Raises:
             ValueError: If decryption fails
         """
-        try:
-            # Prepare the key
-            key = self._prepare_key(self.encryption_key)
+        return self._decrypt_with_key(self._prepared_key, encrypted_data)
+    
+    def _decrypt_with_key(self, key: bytes, encrypted_data: str) -> str:
+        """
+        Decrypt a value with an already prepared 32-byte key
+        
+        Args:
+            key: Prepared key buffer (see _prepare_key)
+            encrypted_data: Base64 encoded encrypted data in format "IV:encrypted_data"
+            
+        Returns:
+            Decrypted text
             
+        Raises:
+            ValueError: If decryption fails
+        """
+        try:
             # Split IV and encrypted data (format: "IV:encrypted_data")
             parts = encrypted_data.split(':')
             if len(parts) < 2:
@@ -65,22 +89,28 @@ class DecryptionService:
             iv_base64 = parts[0]
             encrypted_base64 = parts[1]
             
-            # Decode base64 components
-            iv = base64.b64decode(iv_base64)
-            encrypted = base64.b64decode(encrypted_base64)
-            
-            # Create cipher
-            cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
-            decryptor = cipher.decryptor()
+            # Decode base64 components (restoring any stripped '=' padding)
+            iv = a2b_base64(iv_base64 + '=' * (-len(iv_base64) % 4))
+            encrypted = a2b_base64(encrypted_base64 + '=' * (-len(encrypted_base64) % 4))
             
             # Decrypt the data
-            decrypted_padded = decryptor.update(encrypted) + decryptor.finalize()
+            if AES is not None:
+                decrypted_padded = AES.new(key, AES.MODE_CBC, iv).decrypt(encrypted)
+            else:
+                cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
+                decryptor = cipher.decryptor()
+                decrypted_padded = decryptor.update(encrypted) + decryptor.finalize()
+            
+            # Remove and validate PKCS7 padding
+            if not decrypted_padded or len(decrypted_padded) % 16:
+                raise ValueError("Decrypted data is not a whole number of AES blocks")
             
-            # Remove PKCS7 padding
-            padding_length = decrypted_padded[-1]
-            decrypted = decrypted_padded[:-padding_length]
+            mv = memoryview(decrypted_padded)
+            padding_length = mv[-1]
+            if not 1 <= padding_length <= 16 or mv[-padding_length:] != bytes([padding_length]) * padding_length:
+                raise ValueError("Invalid PKCS7 padding")
             
-            return decrypted.decode('utf-8')
+            return bytes(mv[:-padding_length]).decode('utf-8')
             
         except Exception as e:
             logger.error(f"Decryption error: {str(e)}")
@@ -105,6 +135,14 @@ class DecryptionService:
         if not env_vars:
             return api_response
         
+        # Nothing to decrypt - hand back the original response without copying
+        if not any(':' in (env_var.get('env_value') or '') and self._looks_like_encrypted_data(env_var['env_value'])
+                   for env_var in env_vars):
+            return api_response
+        
+        # Prepare the key once for all variables
+        key = self._prepared_key
+        
         # Decrypt each environment variable
         decrypted_env_vars = []
         for env_var in env_vars:
@@ -114,7 +152,7 @@ class DecryptionService:
                 
                 # Check if the value appears to be encrypted (contains base64-like data with colons)
                 if ':' in env_value and self._looks_like_encrypted_data(env_value):
-                    decrypted_var['env_value'] = self.decrypt_value(env_value)
+                    decrypted_var['env_value'] = self._decrypt_with_key(key, env_value)
                     decrypted_var['encrypted'] = False  # Mark as decrypted
                     logger.debug(f"Decrypted environment variable: {env_var.get('env_name')}")
                 else:
@@ -145,15 +183,4 @@ class DecryptionService:
         Returns:
             True if it looks like encrypted data
         """
-        try:
-            parts = value.split(':')
-            if len(parts) < 2:
-                return False
-            
-            # Try to decode the first two parts as base64
-            base64.b64decode(parts[0])
-            base64.b64decode(parts[1])
-            return True
-            
-        except Exception:
-            return False
+        return bool(_ENCRYPTED_VALUE_RE.match(value))
@@ -5,11 +5,12 @@ This module implements dynamic SQLAlchemy session binding that allows existing c
 to work without changes while automatically using domain-specific database connections.
 """
 
+import inspect
 import logging
 from flask import g, has_request_context
 from sqlalchemy.orm import Query, scoped_session
 from sqlalchemy.orm.query import Query as BaseQuery
-from app.database import db
+from app.database import db, DomainAwareQueryProperty
 
 logger = logging.getLogger(__name__)
 
@@ -76,92 +77,22 @@ class DomainAwareSessionMixin:
 
 def setup_domain_aware_models():
     """
-    Configure all models to use domain-aware queries.
+    Verify that all models use domain-aware queries.
     
-    This function modifies all existing models to use the DomainAwareQuery class,
-    enabling automatic domain-specific database routing without code changes.
+    get_session is inherited from DomainAwareModel and the query property is
+    assigned on db.Model in app.database, so no per-model setup is needed.
+    This only checks that every mapped model resolves to that query property.
     """
-    try:
-        # Import all active models (excluding deprecated ones)
-        from app.models.user import User
-        from app.models.profile import Profile
-        from app.models.requirement import Requirement
-        from app.models.skills import Skills
-        from app.models.email_details import EmailDetails
-        from app.models.profile_records import ProfileRecords
-        from app.models.screening import Screening
-        from app.models.interview_scheduled import InterviewScheduled
-        from app.models.interview_round_one import InterviewRoundOne
-        from app.models.interview_round_two import InterviewRoundTwo
-        from app.models.offer import Offer
-        from app.models.onboarding import Onboarding
-        from app.models.api import Api
-        from app.models.system_settings import SystemSettings
-        from app.models.meeting import Meeting
-        from app.models.sla_config import SLAConfig
-        from app.models.sla_tracker import SLATracker
-        from app.models.notification import Notification
-        
-        # Include deprecated models only if they're still being used
-        # These are kept for backward compatibility but should be phased out
-        try:
-            from app.models.status_tracker import StatusTracker
-            from app.models.tracker import Tracker
-            from app.models.workflow_progress import WorkflowProgress
-            deprecated_models = [StatusTracker, Tracker, WorkflowProgress]
-        except ImportError:
-            deprecated_models = []
-        
-        # List of all active models to configure
-        active_models = [
-            User, Profile, Requirement, Skills, EmailDetails, ProfileRecords,
-            Screening, InterviewScheduled, InterviewRoundOne, InterviewRoundTwo,
-            Offer, Onboarding, Api, SystemSettings, Meeting, SLAConfig,
-            SLATracker, Notification
-        ]
-        
-        # Combine active and deprecated models
-        models = active_models + deprecated_models
-        
-        # Configure each model to use domain-aware queries
-        for model in models:
-            try:
-                # Override the query property with a domain-aware version
-                # IMPORTANT: Do NOT access model.query here (no app context yet)
-                def create_domain_aware_query_property(model_class):
-                    @property
-                    def domain_aware_query(cls):
-                        # Check for domain-specific session first
-                        if has_request_context() and hasattr(g, 'db_session') and g.db_session is not None:
-                            logger.debug(f"Using domain session for {model_class.__name__} query")
-                            return g.db_session.query(model_class)
-                        else:
-                            logger.debug(f"Using default session for {model_class.__name__} query")
-                            return db.session.query(model_class)
-                    return domain_aware_query
-                
-                # Replace the query property on the model class
-                setattr(model, 'query', create_domain_aware_query_property(model))
-                
-                # Add the session getter method
-                def get_session(cls):
-                    if has_request_context() and hasattr(g, 'db_session') and g.db_session is not None:
-                        return g.db_session
-                    return db.session
-                
-                model.get_session = classmethod(get_session)
-                
-                logger.debug(f"Configured domain-aware queries for model: {model.__name__}")
-                
-            except Exception as e:
-                logger.error(f"Failed to configure domain-aware queries for model {model.__name__}: {str(e)}")
-                continue
-        
-        logger.info(f"Successfully configured domain-aware queries for {len(models)} models")
-        
-    except Exception as e:
-        logger.error(f"Error setting up domain-aware models: {str(e)}")
-        raise
+    models = [mapper.class_ for mapper in db.Model.registry.mappers]
+    not_domain_aware = [
+        model.__name__ for model in models
+        if not isinstance(inspect.getattr_static(model, 'query', None), DomainAwareQueryProperty)
+    ]
+    
+    if not_domain_aware:
+        logger.warning(f"Models without domain-aware queries: {not_domain_aware}")
+    
+    logger.info(f"Domain-aware queries available for {len(models) - len(not_domain_aware)} models")
 
 def get_current_session():
     """
@@ -1,22 +1,45 @@
+import heapq
 import logging
 import time
-from typing import Dict, Optional, Any
+from collections import namedtuple
+from typing import Dict, List, Optional, Any, Tuple
 from threading import Lock
+from types import MappingProxyType
 import json
 
 logger = logging.getLogger(__name__)
 
+# Compact cache record; credentials are a read-only mapping and expires_at is a
+# time.monotonic() deadline
+CacheEntry = namedtuple('CacheEntry', 'credentials expires_at ttl')
+
 class DomainCredentialCache:
     """In-memory cache for domain database credentials"""
     
-    def __init__(self, default_ttl: int = 3600):  # Default 1 hour TTL
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._lock = Lock()
+    # Number of lock shards; must be a power of two
+    SHARD_COUNT = 16
+    
+    def __init__(self, default_ttl: int = 3600, maxsize: int = 4096):  # Default 1 hour TTL
+        # Entries are spread over independently locked shards. Each shard dict is an
+        # immutable snapshot: writers copy it under the shard lock and rebind the
+        # slot (atomic in CPython), so readers never need to take a lock.
+        self._cache: List[Dict[str, CacheEntry]] = [{} for _ in range(self.SHARD_COUNT)]
+        self._locks: List[Lock] = [Lock() for _ in range(self.SHARD_COUNT)]
+        # Per-shard min-heaps of (expires_at, domain); may hold stale pairs for
+        # refreshed or deleted entries, which are skipped when popped
+        self._expiry_heaps: List[List[Tuple[float, str]]] = [[] for _ in range(self.SHARD_COUNT)]
         self.default_ttl = default_ttl
+        # Bound memory: each shard holds at most its share of maxsize entries
+        self.maxsize = maxsize
+        self._shard_maxsize = max(1, -(-maxsize // self.SHARD_COUNT))
+    
+    def _shard(self, domain: str) -> int:
+        """Get the shard index for a domain"""
+        return hash(domain) & (self.SHARD_COUNT - 1)
     
-    def _is_expired(self, cache_entry: Dict[str, Any]) -> bool:
-        """Check if cache entry is expired"""
-        return time.time() > cache_entry.get('expires_at', 0)
+    def _is_expired(self, cache_entry: CacheEntry, now: float) -> bool:
+        """Check if cache entry is expired at the given monotonic time"""
+        return now > cache_entry.expires_at
     
     def get(self, domain: str) -> Optional[Dict[str, str]]:
         """
@@ -26,23 +49,23 @@ class DomainCredentialCache:
             domain: Domain identifier (e.g., 'rgvdit-rops.rigvedtech.com:3000')
             
         Returns:
-            Dictionary with PostgreSQL credentials or None if not found/expired
+            Read-only mapping with PostgreSQL credentials or None if not found/expired
         """
-        with self._lock:
-            if domain not in self._cache:
-                logger.debug(f"No cache entry found for domain: {domain}")
-                return None
-            
-            cache_entry = self._cache[domain]
-            
-            # Check if expired
-            if self._is_expired(cache_entry):
-                logger.info(f"Cache entry expired for domain: {domain}")
-                del self._cache[domain]
-                return None
-            
-            logger.debug(f"Cache hit for domain: {domain}")
-            return cache_entry['credentials'].copy()
+        # Lock-free read of the current shard snapshot
+        cache_entry = self._cache[self._shard(domain)].get(domain)
+        if cache_entry is None:
+            logger.debug(f"No cache entry found for domain: {domain}")
+            return None
+        
+        # Check if expired - only then does the reader take the shard lock, to evict it
+        if self._is_expired(cache_entry, time.monotonic()):
+            logger.info(f"Cache entry expired for domain: {domain}")
+            self._evict_if_expired(domain)
+            return None
+        
+        logger.debug(f"Cache hit for domain: {domain}")
+        # Credentials are frozen at set time, so they can be shared without copying
+        return cache_entry.credentials
     
     def set(self, domain: str, credentials: Dict[str, str], ttl: Optional[int] = None) -> None:
         """
@@ -56,17 +79,24 @@ class DomainCredentialCache:
         if ttl is None:
             ttl = self.default_ttl
         
-        expires_at = time.time() + ttl
+        # Monotonic deadline, immune to wall-clock adjustments
+        expires_at = time.monotonic() + ttl
         
-        cache_entry = {
-            'credentials': credentials.copy(),
-            'cached_at': time.time(),
-            'expires_at': expires_at,
-            'ttl': ttl
-        }
+        cache_entry = CacheEntry(MappingProxyType(dict(credentials)), expires_at, ttl)
         
-        with self._lock:
-            self._cache[domain] = cache_entry
+        shard = self._shard(domain)
+        with self._locks[shard]:
+            snapshot = dict(self._cache[shard])
+            snapshot[domain] = cache_entry
+            if len(snapshot) > self._shard_maxsize:
+                self._evict_for_capacity(snapshot)
+            self._cache[shard] = snapshot
+            
+            expiry_heap = self._expiry_heaps[shard]
+            heapq.heappush(expiry_heap, (expires_at, domain))
+            # Drop stale pairs once they dominate the heap
+            if len(expiry_heap) > 2 * len(snapshot) + 8:
+                self._rebuild_expiry_heap(shard)
             logger.info(f"Cached credentials for domain: {domain} (TTL: {ttl}s)")
     
     def delete(self, domain: str) -> bool:
@@ -79,21 +109,69 @@ class DomainCredentialCache:
         Returns:
             True if entry was removed, False if not found
         """
-        with self._lock:
-            if domain in self._cache:
-                del self._cache[domain]
+        shard = self._shard(domain)
+        with self._locks[shard]:
+            if domain in self._cache[shard]:
+                snapshot = dict(self._cache[shard])
+                del snapshot[domain]
+                self._cache[shard] = snapshot
                 logger.info(f"Removed cache entry for domain: {domain}")
                 return True
             else:
                 logger.debug(f"No cache entry to remove for domain: {domain}")
                 return False
     
+    def _evict_for_capacity(self, snapshot: Dict[str, CacheEntry]) -> None:
+        """
+        Shrink a shard snapshot (being built under its lock) back to capacity
+        
+        Expired entries go first; if the shard is still full, the entries
+        closest to expiry are evicted.
+        """
+        current_time = time.monotonic()
+        for domain in [d for d, entry in snapshot.items() if current_time > entry.expires_at]:
+            del snapshot[domain]
+        
+        overflow = len(snapshot) - self._shard_maxsize
+        if overflow > 0:
+            soonest = sorted(snapshot, key=lambda d: snapshot[d].expires_at)[:overflow]
+            for domain in soonest:
+                del snapshot[domain]
+            logger.info(f"Evicted {overflow} cache entries to stay within maxsize")
+    
+    def _rebuild_expiry_heap(self, shard: int) -> None:
+        """Rebuild a shard's expiry heap from its live entries (shard lock must be held)"""
+        expiry_heap = [(entry.expires_at, domain) for domain, entry in self._cache[shard].items()]
+        heapq.heapify(expiry_heap)
+        self._expiry_heaps[shard] = expiry_heap
+    
+    def _evict_if_expired(self, domain: str) -> bool:
+        """
+        Evict an entry a reader found expired
+        
+        Returns:
+            True if the entry was removed
+        """
+        shard = self._shard(domain)
+        with self._locks[shard]:
+            # The entry may have been refreshed since the reader saw it expire
+            cache_entry = self._cache[shard].get(domain)
+            if cache_entry is None or not self._is_expired(cache_entry, time.monotonic()):
+                return False
+            snapshot = dict(self._cache[shard])
+            del snapshot[domain]
+            self._cache[shard] = snapshot
+            return True
+    
     def clear(self) -> None:
         """Clear all cached entries"""
-        with self._lock:
-            cleared_count = len(self._cache)
-            self._cache.clear()
-            logger.info(f"Cleared {cleared_count} cache entries")
+        cleared_count = 0
+        for shard, lock in enumerate(self._locks):
+            with lock:
+                cleared_count += len(self._cache[shard])
+                self._cache[shard] = {}
+                self._expiry_heaps[shard] = []
+        logger.info(f"Cleared {cleared_count} cache entries")
     
     def cleanup_expired(self) -> int:
         """
@@ -102,21 +180,34 @@ class DomainCredentialCache:
         Returns:
             Number of entries removed
         """
-        expired_domains = []
+        removed_count = 0
         
-        with self._lock:
-            current_time = time.time()
-            for domain, cache_entry in self._cache.items():
-                if current_time > cache_entry.get('expires_at', 0):
-                    expired_domains.append(domain)
-            
-            for domain in expired_domains:
-                del self._cache[domain]
+        for shard, lock in enumerate(self._locks):
+            with lock:
+                current_time = time.monotonic()
+                shard_cache = self._cache[shard]
+                expiry_heap = self._expiry_heaps[shard]
+                expired_domains = []
+                
+                # Only pop deadlines that have passed: O(k log n) for k expired entries
+                while expiry_heap and expiry_heap[0][0] < current_time:
+                    expires_at, domain = heapq.heappop(expiry_heap)
+                    cache_entry = shard_cache.get(domain)
+                    if cache_entry is not None and cache_entry.expires_at == expires_at:
+                        expired_domains.append(domain)
+                
+                if expired_domains:
+                    snapshot = dict(shard_cache)
+                    for domain in expired_domains:
+                        del snapshot[domain]
+                    self._cache[shard] = snapshot
+                
+                removed_count += len(expired_domains)
         
-        if expired_domains:
-            logger.info(f"Cleaned up {len(expired_domains)} expired cache entries")
+        if removed_count:
+            logger.info(f"Cleaned up {removed_count} expired cache entries")
         
-        return len(expired_domains)
+        return removed_count
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """
@@ -125,24 +216,38 @@ class DomainCredentialCache:
         Returns:
             Dictionary with cache statistics
         """
-        with self._lock:
-            current_time = time.time()
-            total_entries = len(self._cache)
-            expired_entries = 0
-            active_entries = 0
+        total_entries = 0
+        expired_entries = 0
+        active_entries = 0
+        
+        current_time = time.monotonic()
+        for shard_cache in self._cache:
+            # Snapshots are immutable, so no lock is needed to read them
+            total_entries += len(shard_cache)
             
-            for cache_entry in self._cache.values():
-                if current_time > cache_entry.get('expires_at', 0):
+            for cache_entry in shard_cache.values():
+                if current_time > cache_entry.expires_at:
                     expired_entries += 1
                 else:
                     active_entries += 1
-            
-            return {
-                'total_entries': total_entries,
-                'active_entries': active_entries,
-                'expired_entries': expired_entries,
-                'cache_domains': list(self._cache.keys())
-            }
+        
+        return {
+            'total_entries': total_entries,
+            'active_entries': active_entries,
+            'expired_entries': expired_entries
+        }
+    
+    def list_domains(self) -> List[str]:
+        """
+        Get all cached domain names (including expired entries not yet evicted)
+        
+        Returns:
+            List of domain identifiers
+        """
+        domains = []
+        for shard_cache in self._cache:
+            domains.extend(shard_cache.keys())
+        return domains
     
     def has_domain(self, domain: str) -> bool:
         """
@@ -154,8 +259,7 @@ class DomainCredentialCache:
         Returns:
             True if domain exists in cache, False otherwise
         """
-        with self._lock:
-            return domain in self._cache
+        return domain in self._cache[self._shard(domain)]
 
 # Global cache instance
 domain_cache = DomainCredentialCache()
@@ -226,6 +330,10 @@ class DomainCacheService:
         """Get cache statistics and information"""
         return self.cache.get_cache_stats()
     
+    def get_cached_domains(self) -> List[str]:
+        """Get the domains currently held in the cache"""
+        return self.cache.list_domains()
+    
     def is_domain_cached(self, domain: str) -> bool:
         """
         Check if domain has valid cached credentials
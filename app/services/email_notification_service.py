@@ -1,126 +1,138 @@
-from typing import Optional, Dict, Any
+import queue
+import threading
+import time
+from threading import Lock
+from typing import Optional, Dict, Any, Tuple
 from flask import current_app, g
+from sqlalchemy import event
 from app.models.user import User
 from app.services.email_processor import EmailProcessor
 from app.database import db
 from datetime import datetime
+from html import escape as _esc
+import string
 
-
-class EmailNotificationService:
-    """Service to handle email notifications for various events"""
-    
-    @staticmethod
-    def get_db_session():
-        """Get the correct database session for the current domain"""
-        try:
-            if hasattr(g, 'db_session') and g.db_session is not None:
-                if hasattr(g.db_session, 'query'):
-                    return g.db_session
-            return db.session
-        except Exception:
-            return db.session
-    
-    @staticmethod
-    def send_new_assignment_email(
-        recruiter_username: str,
-        request_id: str,
-        job_title: str,
-        company_name: str,
-        requirement_details: Optional[Dict[str, Any]] = None
-    ) -> bool:
-        """Send email notification for new assignment"""
-        try:
-            # Find the recruiter user - only fetch email
-            session = EmailNotificationService.get_db_session()
-            user_email = session.query(User.email).filter_by(username=recruiter_username).scalar()
-            if not user_email:
-                current_app.logger.warning(f"Recruiter {recruiter_username} not found or has no email address configured")
-                return False
-            
-            # Create email content
-            subject = f"New Assignment - {request_id}: {job_title}"
-            html_content = EmailNotificationService._create_assignment_email_template(
-                recruiter_username=recruiter_username,
-                request_id=request_id,
-                job_title=job_title,
-                company_name=company_name,
-                requirement_details=requirement_details
-            )
-            
-            # Send email using EmailProcessor
-            email_processor = EmailProcessor()
-            result = email_processor.send_email(
-                to_email=user_email,
-                subject=subject,
-                body=html_content,
-                request_id=request_id
-            )
-            
-            if result.get('success', False):
-                current_app.logger.info(f"Assignment email sent successfully to {user_email} for {request_id}")
-                return True
-            else:
-                current_app.logger.error(f"Failed to send assignment email to {user_email}: {result.get('error', 'Unknown error')}")
-                return False
-                
-        except Exception as e:
-            current_app.logger.error(f"Error sending assignment email to {recruiter_username}: {str(e)}")
-            return False
-    
-    @staticmethod
-    def _create_assignment_email_template(
-        recruiter_username: str,
-        request_id: str,
-        job_title: str,
-        company_name: str,
-        requirement_details: Optional[Dict[str, Any]] = None
-    ) -> str:
-        """Create HTML email template for new assignment notification"""
-        
-        # Build requirement details section
-        details_html = ""
-        if requirement_details:
-            details_rows = []
-            
-            detail_fields = [
-                ('Department', 'department'),
-                ('Location', 'location'),
-                ('Experience Range', 'experience_range'),
-                ('Skills Required', 'skills_required'),
-                ('Budget CTC', 'budget_ctc'),
-                ('Number of Positions', 'number_of_positions'),
-                ('Priority', 'priority'),
-                ('Tentative DOJ', 'tentative_doj')
-            ]
-            
-            for label, field in detail_fields:
-                value = requirement_details.get(field)
-                if value:
-                    details_rows.append(f"""
+# Static parts of the assignment email, compiled once; only the dynamic fields are substituted per email
+_DETAIL_ROW_TEMPLATE = """
                         <tr>
-                            <td style="padding: 8px; border-bottom: 1px solid #e5e7eb; font-weight: 600; color: #374151; width: 180px;">{label}:</td>
-                            <td style="padding: 8px; border-bottom: 1px solid #e5e7eb; color: #6b7280;">{value}</td>
+                            <td style="padding: 8px; border-bottom: 1px solid #e5e7eb; font-weight: 600; color: #374151; width: 180px;">%s:</td>
+                            <td style="padding: 8px; border-bottom: 1px solid #e5e7eb; color: #6b7280;">%s</td>
                         </tr>
-                    """)
-            
-            if details_rows:
-                details_html = f"""
+                    """
+
+# (label, requirement_details key) pairs shown in the details table, in display order
+_DETAIL_FIELDS = (
+    ('Department', 'department'),
+    ('Location', 'location'),
+    ('Experience Range', 'experience_range'),
+    ('Skills Required', 'skills_required'),
+    ('Budget CTC', 'budget_ctc'),
+    ('Number of Positions', 'number_of_positions'),
+    ('Priority', 'priority'),
+    ('Tentative DOJ', 'tentative_doj')
+)
+
+_DETAILS_SECTION_TEMPLATE = string.Template("""
                 <div style="margin: 20px 0;">
                     <h3 style="color: #374151; font-size: 16px; font-weight: 600; margin-bottom: 12px;">Requirement Details:</h3>
                     <table style="width: 100%; border-collapse: collapse; background-color: #f9fafb; border-radius: 6px;">
-                        {''.join(details_rows)}
+                        $rows
                     </table>
                 </div>
-                """
-        
-        # Create the full email template
-        html_template = f"""
+                """)
+
+# (domain, username) -> (email, monotonic deadline); recruiter emails rarely change
+_RECRUITER_EMAIL_TTL = 300
+_recruiter_email_cache: Dict[Tuple[Optional[str], str], Tuple[str, float]] = {}
+_recruiter_email_lock = Lock()
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_recruiter_email_cache(mapper, connection, target):
+    """Drop cached recruiter emails whenever a user row changes"""
+    with _recruiter_email_lock:
+        _recruiter_email_cache.clear()
+
+# Outgoing emails are sent by a background worker so Graph API latency stays off the request thread
+_email_queue: 'queue.Queue[Tuple[Any, str, str, str, str]]' = queue.Queue()
+_email_worker: Optional[threading.Thread] = None
+_email_worker_lock = Lock()
+
+# Shared EmailProcessor, built lazily (needs an app context) and reused for every send
+_email_processor: Optional[EmailProcessor] = None
+_email_processor_lock = Lock()
+
+
+def _get_email_processor() -> EmailProcessor:
+    """Return the process-wide EmailProcessor, creating it on first use"""
+    global _email_processor
+    if _email_processor is None:
+        with _email_processor_lock:
+            if _email_processor is None:
+                _email_processor = EmailProcessor()
+    return _email_processor
+
+
+def _email_worker_loop():
+    """Drain the email queue, sending each message with the shared EmailProcessor"""
+    while True:
+        app, to_email, subject, body, request_id = _email_queue.get()
+        try:
+            with app.app_context():
+                email_processor = _get_email_processor()
+                result = email_processor.send_email(
+                    to_email=to_email,
+                    subject=subject,
+                    body=body,
+                    request_id=request_id
+                )
+                
+                if result.get('success', False):
+                    app.logger.info(f"Assignment email sent successfully to {to_email} for {request_id}")
+                else:
+                    app.logger.error(f"Failed to send assignment email to {to_email}: {result.get('error', 'Unknown error')}")
+        except Exception as e:
+            app.logger.error(f"Error sending assignment email to {to_email}: {str(e)}")
+        finally:
+            _email_queue.task_done()
+
+
+def _ensure_email_worker():
+    """Start the background email worker once per process"""
+    global _email_worker
+    if _email_worker is not None and _email_worker.is_alive():
+        return
+    with _email_worker_lock:
+        if _email_worker is None or not _email_worker.is_alive():
+            _email_worker = threading.Thread(target=_email_worker_loop, name='assignment-email-worker', daemon=True)
+            _email_worker.start()
+
+# Footer timestamp has minute resolution, so format it at most once per minute
+_generated_on_cache: Tuple[int, str] = (-1, '')
+_generated_on_lock = Lock()
+
+
+def _generated_on() -> str:
+    """Return the footer 'Generated on' timestamp, reformatted only when the minute changes"""
+    global _generated_on_cache
+    minute = int(time.time() // 60)
+    cached_minute, formatted = _generated_on_cache
+    if cached_minute == minute:
+        return formatted
+    
+    with _generated_on_lock:
+        formatted = datetime.now().strftime('%B %d, %Y at %I:%M %p')
+        _generated_on_cache = (minute, formatted)
+    return formatted
+
+_ASSIGNMENT_EMAIL_TEMPLATE = string.Template("""
         <!DOCTYPE html>
         <html lang="en">
         <head>
             <meta charset="UTF-8">
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>New Assignment - {request_id}</title>
+            <title>New Assignment - $request_id</title>
         </head>
         <body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; background-color: #f3f4f6;">
             <div style="max-width: 600px; margin: 0 auto; background-color: #ffffff; border-radius: 8px; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1); overflow: hidden;">
@@ -135,23 +147,23 @@ class EmailNotificationService:
                 <div style="padding: 32px 24px;">
                     <div style="text-align: center; margin-bottom: 24px;">
                         <div style="background-color: #dbeafe; color: #1e40af; padding: 12px 20px; border-radius: 6px; display: inline-block; font-weight: 600; font-size: 18px;">
-                            {request_id}
+                            $request_id
                         </div>
                     </div>
                     
                     <div style="background-color: #f8fafc; padding: 20px; border-radius: 8px; border-left: 4px solid #3b82f6; margin-bottom: 24px;">
-                        <h2 style="color: #1f2937; margin: 0 0 8px 0; font-size: 20px; font-weight: 600;">{job_title}</h2>
-                        <p style="color: #6b7280; margin: 0; font-size: 16px;">at <strong style="color: #374151;">{company_name}</strong></p>
+                        <h2 style="color: #1f2937; margin: 0 0 8px 0; font-size: 20px; font-weight: 600;">$job_title</h2>
+                        <p style="color: #6b7280; margin: 0; font-size: 16px;">at <strong style="color: #374151;">$company_name</strong></p>
                     </div>
                     
                     <div style="margin-bottom: 24px;">
                         <p style="color: #374151; font-size: 16px; line-height: 1.6; margin: 0;">
-                            Hello <strong>{recruiter_username}</strong>,<br><br>
+                            Hello <strong>$recruiter_username</strong>,<br><br>
                             You have been assigned a new requirement. Please review the details below and start working on this assignment.
                         </p>
                     </div>
                     
-                    {details_html}
+                    $details_html
                     
                     <!-- Call to Action -->
                     <div style="text-align: center; margin: 32px 0 24px 0;">
@@ -176,12 +188,122 @@ class EmailNotificationService:
                 <div style="background-color: #f8fafc; padding: 20px 24px; border-top: 1px solid #e5e7eb; text-align: center;">
                     <p style="color: #6b7280; font-size: 12px; margin: 0;">
                         This is an automated notification from the Recruitment Tracking System.<br>
-                        Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}
+                        Generated on $generated_on
                     </p>
                 </div>
             </div>
         </body>
         </html>
+        """)
+
+
+class EmailNotificationService:
+    """Service to handle email notifications for various events"""
+    
+    @staticmethod
+    def get_db_session():
+        """Get the correct database session for the current domain"""
+        try:
+            if hasattr(g, 'db_session') and g.db_session is not None:
+                if hasattr(g.db_session, 'query'):
+                    return g.db_session
+            return db.session
+        except Exception:
+            return db.session
+    
+    @staticmethod
+    def _resolve_recruiter_email(recruiter_username: str) -> Optional[str]:
+        """Resolve a recruiter's email, cached per domain for a short TTL"""
+        cache_key = (getattr(g, 'domain', None), recruiter_username)
+        now = time.monotonic()
+        
+        cached = _recruiter_email_cache.get(cache_key)
+        if cached is not None and now < cached[1]:
+            return cached[0]
+        
+        session = EmailNotificationService.get_db_session()
+        user_email = session.query(User.email).filter_by(username=recruiter_username).scalar()
+        
+        # Only cache hits, so a newly configured email is picked up immediately
+        if user_email:
+            with _recruiter_email_lock:
+                _recruiter_email_cache[cache_key] = (user_email, now + _RECRUITER_EMAIL_TTL)
+        
+        return user_email
+    
+    @staticmethod
+    def send_new_assignment_email(
+        recruiter_username: str,
+        request_id: str,
+        job_title: str,
+        company_name: str,
+        requirement_details: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Queue email notification for new assignment
+        
+        Returns True once the email is queued; delivery happens on a background worker.
         """
+        try:
+            # Find the recruiter user - only fetch email
+            user_email = EmailNotificationService._resolve_recruiter_email(recruiter_username)
+            if not user_email:
+                current_app.logger.warning(f"Recruiter {recruiter_username} not found or has no email address configured")
+                return False
+            
+            # Create email content
+            subject = f"New Assignment - {request_id}: {job_title}"
+            html_content = EmailNotificationService._create_assignment_email_template(
+                recruiter_username=recruiter_username,
+                request_id=request_id,
+                job_title=job_title,
+                company_name=company_name,
+                requirement_details=requirement_details
+            )
+            
+            # Hand off to the background worker using EmailProcessor
+            _ensure_email_worker()
+            _email_queue.put((current_app._get_current_object(), user_email, subject, html_content, request_id))
+            current_app.logger.info(f"Assignment email queued for {user_email} for {request_id}")
+            return True
+                
+        except Exception as e:
+            current_app.logger.error(f"Error sending assignment email to {recruiter_username}: {str(e)}")
+            return False
+    
+    @staticmethod
+    def _create_assignment_email_template(
+        recruiter_username: str,
+        request_id: str,
+        job_title: str,
+        company_name: str,
+        requirement_details: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Create HTML email template for new assignment notification"""
+        
+        # User-supplied values are escaped once, right before substitution
+        recruiter_username, request_id, job_title, company_name = map(
+            _esc, (str(recruiter_username), str(request_id), str(job_title), str(company_name))
+        )
+        
+        # Build requirement details section
+        details_html = ""
+        if requirement_details:
+            details_rows = [
+                _DETAIL_ROW_TEMPLATE % (label, _esc(str(value)))
+                for label, field in _DETAIL_FIELDS
+                if (value := requirement_details.get(field))
+            ]
+            
+            if details_rows:
+                details_html = _DETAILS_SECTION_TEMPLATE.substitute(rows=''.join(details_rows))
         
-        return html_template
+        # Fill in the full email template
+        return _ASSIGNMENT_EMAIL_TEMPLATE.substitute(
+            request_id=request_id,
+            job_title=job_title,
+            company_name=company_name,
+            recruiter_username=recruiter_username,
+            details_html=details_html,
+            generated_on=_generated_on()
+        )
@@ -1,10 +1,9 @@
 import re
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import html2text
-import chardet
 from bs4 import BeautifulSoup
 import requests
-from typing import Any, Dict, List, Optional, Union, cast
+from typing import Any, Dict, List, Optional, Tuple, Union, cast
 from flask import current_app
 import os
 from app.database import db
@@ -15,27 +14,1204 @@ from app.services.resume_parser import ResumeParser
 import msal
 import base64
 import uuid
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session, scoped_session
 from flask_sqlalchemy.session import Session
 import html
 import pandas as pd
+import numpy as np
 from io import StringIO
 import time
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from config import Config
 
+try:
+    import lxml.html as lxml_html
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_html = None
+    lxml_etree = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from selectolax.parser import HTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+# libxml2-backed tree builder for BeautifulSoup when lxml is installed
+_SOUP_PARSER = 'lxml' if lxml_html is not None else 'html.parser'
+
+_NAN_RE = re.compile(r'(?i)\b(nan|na|n/a|nil|null)\b')
+_NUMBER_RE = re.compile(r'(\d+(?:\.\d+)?)')
+_DAYS_OR_MONTHS_RE = re.compile(r'(\d+)\s*(?:day|month)')
+# Phone numbers keep only digits, '+' and '-'
+_PHONE_STRIP_RE = re.compile(r'[^\d+\-]')
+_PHONE_ASCII_DELETE = str.maketrans('', '', ''.join(chr(c) for c in range(128) if chr(c) not in '0123456789+-'))
+_WHITESPACE_RE = re.compile(r'\s+')
+_LONG_DIGITS_RE = re.compile(r'\d{10,}')
+_NUMERIC_ONLY_RE = re.compile(r'^[\d\s\-\+\(\)\.]+$')
+_NON_NAME_RE = re.compile('|'.join([
+    r'www\.',
+    r'\.com',
+    r'\.in',
+    r'http',
+    r'toll.?free',
+    r'pvt\.?\s*ltd',
+    r'limited',
+    r'corporation',
+    r'company',
+    r'technologies',
+    r'solutions',
+    r'services',
+    r'systems',
+    r'floor',
+    r'building',
+    r'road',
+    r'street',
+    r'mumbai',
+    r'bangalore',
+    r'delhi',
+    r'pune',
+    r'hyderabad',
+    r'chennai',
+    r'kolkata'
+]))
+# Linked images, images, then links; applied in order
+_MARKDOWN_LINK_RES = tuple(re.compile(pattern) for pattern in (
+    r'\[!\[.*?\]\(.*?\)\]\(.*?\)',
+    r'!\[.*?\]\(.*?\)',
+    r'\[.*?\]\(.*?\)'
+))
+# Signature/disclaimer markers, each removed through to the end of the value; applied in order
+_SIGNATURE_RES = tuple(re.compile(pattern, re.IGNORECASE | re.MULTILINE | re.DOTALL) for pattern in (
+    r'---.*$',  # Common signature separator
+    r'Disclaimer:.*$',
+    r'This email.*confidential.*$',
+    r'\*\*.*Ltd\*\*.*$',  # Company names in bold
+    r'Human Resource.*$'
+))
+_COLUMN_STRIP_RE = re.compile(r'[^\w\s\.]')
+_FIELD_STRIP_RE = re.compile(r'[^a-z0-9\s_]')
+_YEARS_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:year|yr)')
+_MONTHS_RE = re.compile(r'(\d+)\s*(?:month|mon)')
+_MONTH_COUNT_RE = re.compile(r'(\d+)\s*month')
+_DAY_COUNT_RE = re.compile(r'(\d+)\s*day')
+_NOTICE_DATE_RE = re.compile(r'\d{1,2}(?:st|nd|rd|th)?\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*(?:\s+\d{4})?')
+_LAKHS_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:lac|lakh|lpa|l)')
+_SKILL_SPLIT_RE = re.compile(r'[,|;]')
+_SKILL_RATING_RE = re.compile(r'\s*-\s*\d+(?:\.\d+)?\s*$')
+
+# Email text cleanup
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+# Blank-line runs collapse to one empty line, other space/tab runs to a space
+_TEXT_SPACING_RE = re.compile(r'(\n\s*\n)|[ \t]+')
+# Real markup rather than a stray '<' or a quoted <user@example.com> address
+_HTML_TAG_RE = re.compile(r'<(?:html|head|body|div|p|br|table|tr|td|span|font|img|a)(?=[\s/>])|</[a-z]', re.IGNORECASE)
+_CID_URL_RE = re.compile(r'cid:[^\s"\'<>]+')
+# Table separators, zero-width spaces and nbsp dropped from extracted values
+_VALUE_STRIP_TABLE = str.maketrans('', '', '|\u00A0\u200B\u200C\u200D\uFEFF')
+_STYLE_BLOCK_RE = re.compile(r'<style[^>]*>.*?</style>', re.DOTALL)
+_SCRIPT_BLOCK_RE = re.compile(r'<script[^>]*>.*?</script>', re.DOTALL)
+_BR_TAG_RE = re.compile(r'<br[^>]*>')
+_DIV_BREAK_RE = re.compile(r'</div>\s*<div[^>]*>')
+# Substrings marking a line of an extracted value as contact info or boilerplate
+_SIG_TOKENS = ('@', 'www.', 'http', '.com', '.in', '.org', 'copyright', 'all rights')
+_KEY_VALUE_LINE_RE = re.compile(r'^[\w\s\.-]+\s*[|:]\s*[\w\s\.-]+$')
+# Email signatures and disclaimers stripped from extracted values, applied in
+# order. Values are whitespace normalized before matching, so each hit cuts the
+# value at its start instead of carrying a greedy ``.*$`` tail, and keywords are
+# anchored on word boundaries so the engine does not retry them at every
+# character of a long line.
+_VALUE_SIGNATURE_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'\bDisclaimer:',
+    r'\bThis email (?:and|&) any',
+    r'\bThe information contained',
+    r'\bConfidentiality Notice:',
+    r'\bwww\.[\w\.-]+\.[a-z]{2,}',  # Website URLs
+    r'\b(?:T|Tel|M|Mob|E|Email)[\s:]+[\w\.-]+@[\w-]+(?:\.[\w-]+)*\.[a-z]{2,}',  # Contact details
+    r'\b(?:T|Tel|M|Mob)[\s:]+(?:\+\d{1,4}[-\s]?)?\d[-\d\s]{8,}',  # Phone numbers
+    r'\b(?:regards|thank(?:s|ing) you|best|sincerely|yours truly)',  # Email closings
+    r'\b(?:floor|building|road|street|lane|area)(?=.*\d{6})',  # Addresses
+))
+
+
+def _collapse_spacing(match: re.Match) -> str:
+    """Replacement for _TEXT_SPACING_RE matches."""
+    return '\n\n' if match.group(1) else ' '
+
+
+# Job requirement extraction
+_RFH_FIELD_PATTERN_SOURCES = {
+    'job_title': [
+        r'job\s*title\s*:?\s*([^:\n]+?)(?=\s*(?:department|location|experience|$))',
+        r'position\s*:?\s*([^:\n]+?)(?=\s*(?:department|location|experience|$))',
+        r'role\s*:?\s*([^:\n]+?)(?=\s*(?:department|location|experience|$))'
+    ],
+    'department': [
+        r'department\s*:?\s*([^:\n]+?)(?=\s*(?:location|shift|$))',
+        r'dept\s*:?\s*([^:\n]+?)(?=\s*(?:location|shift|$))',
+        r'division\s*:?\s*([^:\n]+?)(?=\s*(?:location|shift|$))'
+    ],
+    'location': [
+        r'location\s*:?\s*([^:\n]+?)(?=\s*(?:shift|job\s*type|$))',
+        r'work\s*location\s*:?\s*([^:\n]+?)(?=\s*(?:shift|job\s*type|$))',
+        r'job\s*location\s*:?\s*([^:\n]+?)(?=\s*(?:shift|job\s*type|$))',
+        r'place\s*of\s*work\s*:?\s*([^:\n]+?)(?=\s*(?:shift|job\s*type|$))'
+    ],
+    'shift': [
+        r'shift\s*:?\s*([^:\n]+?)(?=\s*(?:job\s*type|hiring|$))',
+        r'timing\s*:?\s*([^:\n]+?)(?=\s*(?:job\s*type|hiring|$))'
+    ],
+    'job_type': [
+        r'job\s*type\s*:?\s*([^:\n]+?)(?=\s*(?:hiring\s*manager|experience|$))',
+        r'employment\s*type\s*:?\s*([^:\n]+?)(?=\s*(?:hiring\s*manager|experience|$))'
+    ],
+    'hiring_manager': [
+        r'hiring\s*manager\s*:?\s*([^:\n]+?)(?=\s*(?:justification|experience|$))',
+        r'manager\s*:?\s*([^:\n]+?)(?=\s*(?:justification|experience|$))'
+    ],
+    'experience_range': [
+        r'experience\s*range\s*:?\s*([^:\n]+?)(?=\s*(?:skills|minimum|$))',
+        r'experience\s*:?\s*([^:\n]+?)(?=\s*(?:skills|minimum|$))',
+        r'years\s*of\s*experience\s*:?\s*([^:\n]+?)(?=\s*(?:skills|minimum|$))'
+    ],
+    'skills_required': [
+        r'skills\s*required\s*:?\s*([^:\n]+?)(?=\s*(?:minimum|number|$))',
+        r'skills\s*:?\s*([^:\n]+?)(?=\s*(?:minimum|number|$))',
+        r'technical\s*skills\s*:?\s*([^:\n]+?)(?=\s*(?:minimum|number|$))'
+    ],
+    'minimum_qualification': [
+        r'minimum\s*qualification\s*:?\s*([^:\n]+?)(?=\s*(?:preferred|number|budget|$))',
+        r'qualification\s*:?\s*([^:\n]+?)(?=\s*(?:preferred|number|budget|$))',
+        r'education\s*:?\s*([^:\n]+?)(?=\s*(?:preferred|number|budget|$))'
+    ],
+    'number_of_positions': [
+        r'number\s*of\s*positions\s*:?\s*(\d+)',
+        r'positions\s*:?\s*(\d+)',
+        r'openings\s*:?\s*(\d+)'
+    ],
+    'budget_ctc': [
+        r'budgeted\s*ctc\s*range\s*:?\s*([^:\n]+?)(?=\s*(?:internal|tentative|additional|$))',
+        r'budget\s*:?\s*([^:\n]+?)(?=\s*(?:internal|tentative|additional|$))',
+        r'ctc\s*:?\s*([^:\n]+?)(?=\s*(?:internal|tentative|additional|$))',
+        r'salary\s*:?\s*([^:\n]+?)(?=\s*(?:internal|tentative|additional|$))'
+    ],
+    'tentative_doj': [
+        r'tentative\s*doj\s*:?\s*\[?([^:\]\n]+?)(?:\]|\s*(?:additional|thanks|regards|$))',
+        r'date\s*of\s*joining\s*:?\s*\[?([^:\]\n]+?)(?:\]|\s*(?:additional|thanks|regards|$))',
+        r'joining\s*date\s*:?\s*\[?([^:\]\n]+?)(?:\]|\s*(?:additional|thanks|regards|$))'
+    ],
+    'additional_remarks': [
+        r'additional\s*remarks\s*:?\s*\[?([^:\]\n]+?)(?:\]|\s*(?:thanks|regards|$))',
+        r'remarks\s*:?\s*\[?([^:\]\n]+?)(?:\]|\s*(?:thanks|regards|$))',
+        r'notes\s*:?\s*\[?([^:\]\n]+?)(?:\]|\s*(?:thanks|regards|$))'
+    ]
+}
+# Each pattern is paired with its leading literal word: a body that does not
+# contain the word cannot match, so the regex is not run over it at all
+_RFH_FIELD_PATTERNS = {
+    field: tuple(
+        (re.match(r'[a-z]+', pattern).group(), re.compile(pattern, re.IGNORECASE))
+        for pattern in patterns
+    )
+    for field, patterns in _RFH_FIELD_PATTERN_SOURCES.items()
+}
+# RFH emails mention "RFH" or "request for hire/hiring" in the subject or body
+_RFH_DETECT_RE = re.compile(r'\b(?:rfh|request\s+for\s+hir(?:e|ing))\b', re.IGNORECASE)
+_LEADING_BULLET_RE = re.compile(r'^\s*[\[•\-\*]\s*')
+_TRAILING_BULLET_RE = re.compile(r'\s*[\]•\-\*]\s*$')
+_REQUIRED_SKILLS_SPLIT_RE = re.compile(r'[,;&]')
+_CTC_CURRENCY_RE = re.compile(r'(?i)(?:inr|rs\.?|rupees|\(.*?\))')
+# Generic job title patterns, tried against both the subject and the body
+_GENERIC_TITLE_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'requirement\s+for\s+["\']?([^"\']+?)["\']?(?=\s|$)',
+    r'urgent\s+requirement\s+([^,\n]+)',
+    r'opening\s+for\s+([^,\n]+)',
+    r'position:\s*([^,\n:]+?)(?=\s*(?:department|location|experience|skills|$))',
+    r'role:\s*([^,\n:]+?)(?=\s*(?:department|location|experience|skills|$))',
+    r'job\s+title:\s*([^,\n:]+?)(?=\s*(?:department|location|experience|skills|$))',
+    r'hiring\s+for\s+([^,\n]+)'
+))
+# Union of the generic title patterns. A single scan rules out text none of them
+# can match; the individual patterns are still tried in order to keep precedence.
+_GENERIC_TITLE_ANY_RE = re.compile(
+    '|'.join(f'(?:{pattern.pattern})' for pattern in _GENERIC_TITLE_RES), re.IGNORECASE
+)
+_BODY_LOCATION_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'location:\s*([^,\n]+)',
+    r'place\s+of\s+work:\s*([^,\n]+)',
+    r'job\s+location:\s*([^,\n]+)',
+    r'work\s+location:\s*([^,\n]+)'
+))
+
+# Subject line parsing
+_REPLY_PREFIX_RE = re.compile(r'^(?:Re|Fwd|Forward|FW|RE|FWD):\s*')
+# Literal forms of _REPLY_PREFIX_RE, so subjects without a prefix skip the regex
+_REPLY_PREFIXES = ('Re:', 'Fwd:', 'Forward:', 'FW:', 'RE:', 'FWD:')
+_TITLE_STRIP_RE = re.compile(r'[^\w\s-]')
+# The title-bearing subject formats, most specific first. Each is tried in turn:
+# a match whose title is too short falls through to the next one.
+_SUBJECT_TITLE_RES = tuple((name, re.compile(pattern, re.IGNORECASE)) for name, pattern in (
+    # "RFH: Nokia FlowOne Developer - BOSCH - Bangalore"
+    ('RFH company-location', r'RFH\s*:\s*([^-]+?)\s*-\s*[^-]+\s*-\s*[^-]+$'),
+    ('RFH company', r'RFH\s*:\s*([^-]+?)\s*-\s*[^-]+$'),
+    # "Chatbot Developer - BOSCH - Bangalore"
+    ('company-location', r'^([^-]+?)\s*-\s*[^-]+\s*-\s*[^-]+$'),
+    ('company', r'^([^-]+?)\s*-\s*[^-]+$'),
+    # "Request for Hire (RFH) for Full Stack Developer."
+    ('RFH request', r'Request for Hire\s*\(RFH\)\s+for\s+([^.\n]+)'),
+    ('hiring role', r'Request for hiring for role\s+([^.\n]+)')
+))
+_COLON_DASH_SUBJECT_RE = re.compile(r'[:-]\s*([^:-]+)$')
+_TRACKER_SUBJECT_RE = re.compile(r'Resume & Tracker sheet[^:]*[:-]\s*([^:-]+)$', re.IGNORECASE)
+_SUBMISSION_SUBJECT_RE = re.compile(r'Candidate Submission[^:]*[:-]\s*([^:-]+)$', re.IGNORECASE)
+_HIRING_MANAGER_SUBJECT_RE = re.compile(r'Hiring Manager profile \+ RFH Req', re.IGNORECASE)
+# Any of the tracker/submission/hiring-manager markers, checked before the specific patterns
+_STRUCTURED_SUBJECT_ANY_RE = re.compile(
+    r'Resume & Tracker sheet|Candidate Submission|Hiring Manager profile \+ RFH Req', re.IGNORECASE
+)
+# Same order as the former one-sub-per-prefix loop, so chained prefixes ("Re: Fw: ...") are all removed
+_SUBJECT_PREFIX_RE = re.compile(r'^(?:re:\s*)?(?:fw:\s*)?(?:fwd:\s*)?(?:forward:\s*)?(?:reply:\s*)?', re.IGNORECASE)
+_SUBJECT_PREFIXES = ('re:', 'fw:', 'fwd:', 'forward:', 'reply:')  # lowercased prefixes the above can start with
+_SENDER_ADDRESS_RE = re.compile(r'"?([^"<]*)"?\s*<([^>]+)>')  # "Name <email@domain.com>"
+
+# Requirement tables
+_TABLE_INTRO_TITLE_RE = re.compile(r'(?:for|hiring)\s+(?:a\s+)?([^,\n]+?)(?:\s+along|\s+with|\s*$)', re.IGNORECASE)
+_TABLE_BUDGET_RE = re.compile(r'(?:budget|ctc|package)[\s:]+([^\n.]+)', re.IGNORECASE)
+_DIGITS_RE = re.compile(r'\d+')
+# Common header variations in requirement tables mapped to our database fields
+_REQUIREMENT_FIELD_MAPPING = {
+    'position': 'job_title',
+    'role': 'job_title',
+    'designation': 'job_title',
+    'dept': 'department',
+    'team': 'department',
+    'business unit': 'department',
+    'work location': 'location',
+    'city': 'location',
+    'base location': 'location',
+    'timing': 'shift',
+    'work hours': 'shift',
+    'employment type': 'job_type',
+    'contract type': 'job_type',
+    'hiring lead': 'hiring_manager',
+    'manager': 'hiring_manager',
+    'reporting to': 'hiring_manager',
+    'experience': 'experience_range',
+    'exp': 'experience_range',
+    'yoe': 'experience_range',
+    'skills': 'skills_required',
+    'technical skills': 'skills_required',
+    'requirements': 'skills_required',
+    'qualification': 'minimum_qualification',
+    'education': 'minimum_qualification',
+    'degree': 'minimum_qualification',
+    'positions': 'number_of_positions',
+    'headcount': 'number_of_positions',
+    'openings': 'number_of_positions',
+    'budget': 'budget_ctc',
+    'salary': 'budget_ctc',
+    'package': 'budget_ctc',
+    'urgency': 'priority',
+    'importance': 'priority',
+    'joining date': 'tentative_doj',
+    'start date': 'tentative_doj',
+    'doj': 'tentative_doj',
+    'remarks': 'additional_remarks',
+    'comments': 'additional_remarks',
+    'notes': 'additional_remarks'
+}
+_REQUIREMENT_FIELD_PATTERNS = tuple(_REQUIREMENT_FIELD_MAPPING.items())
+# Any mapping pattern, so headers matching none are rejected in one scan
+_REQUIREMENT_HEADER_ANY_RE = re.compile('|'.join(re.escape(pattern) for pattern in _REQUIREMENT_FIELD_MAPPING))
+# Header cells marking a candidate-profile table rather than a requirement table
+_CANDIDATE_TABLE_HEADERS = frozenset({'name', 'candidate', 'consultant'})
+
+# Job title normalization for duplicate detection
+_TITLE_BRACKETS_RE = re.compile(r'^\[?\s*|\s*\]?$')  # leading "[ " and trailing " ]"
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+# Applied in order, each at most once; none can match unless the title starts with one of these
+_TITLE_RFH_PREFIX_STARTS = ('rfh', 'request', 'hiring', 'requirement', 'urgent')
+_TITLE_RFH_PREFIX_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'^rfh\s*:?\s*',
+    r'^request\s+for\s+hiring?\s*:?\s*',
+    r'^request\s+for\s+hire\s*:?\s*',
+    r'^hiring\s+request\s*:?\s*',
+    r'^requirement\s+for\s+',
+    r'^urgent\s+requirement\s*:?\s*'
+))
+_TITLE_NOISE_WORDS_RE = re.compile(r'\b(?:%s)\b' % '|'.join((
+    'position', 'role', 'job', 'opening', 'vacancy', 'requirement',
+    'hiring', 'urgent', 'developer', 'engineer', 'specialist',
+    'for', 'the', 'a', 'an', 'and', 'or', 'with', 'in', 'at'
+)), re.IGNORECASE)
+
+# Profile field -> possible (normalized) column names, in priority order
+_PROFILE_FIELD_COLUMNS = {
+    'total_experience': ['total_experience', 'total_exp', 'total_w_exp', 'exp', 't_exp'],
+    'relevant_experience': ['relevant_experience', 'relevant_exp', 'r_exp'],
+    'current_company': ['current_company', 'company', 'current_employer'],
+    'ctc_current': ['current_ctc', 'c_ctc', 'ctc_current', 'current_salary'],
+    'ctc_expected': ['expected_ctc', 'e_ctc', 'ctc_expected', 'expected_salary'],
+    'notice_period_days': ['notice_period', 'np', 'np_days'],
+    'location': ['current_location', 'location'],
+    'education': ['education', 'qualification', 'graduation'],
+    'key_skills': ['skills', 'key_skills', 'technical_skills', 'skill'],
+    'contact_no': ['contact_no', 'contact_number', 'mobile_no', 'phone', 'mobile'],
+    'email_id': ['email_id', 'email'],
+}
+# Reverse lookup: column name -> (profile field, alias priority)
+_COLUMN_TO_FIELD = {
+    col: (field, rank)
+    for field, possible_cols in _PROFILE_FIELD_COLUMNS.items()
+    for rank, col in enumerate(possible_cols)
+}
+_EMPTY_CELL_VALUES = frozenset({'nan', '', '-', 'na', 'n/a', 'nil', 'null'})
+
+# Values already in the format _normalize_profile_field produces
+_NORMALIZED_LPA_RE = re.compile(r'\d+\.\d LPA')
+_NORMALIZED_YEARS_RE = re.compile(r'\d+\.\d years')
+_NORMALIZED_NOTICE_RE = re.compile(r'\d+ (?:days|months)|Immediate')
+_NORMALIZED_FIELD_RES = {
+    'ctc_current': _NORMALIZED_LPA_RE,
+    'ctc_expected': _NORMALIZED_LPA_RE,
+    'total_experience': _NORMALIZED_YEARS_RE,
+    'relevant_experience': _NORMALIZED_YEARS_RE,
+    'notice_period_days': _NORMALIZED_NOTICE_RE,
+}
+
+def _cell_text(value) -> Optional[str]:
+    """Return the stripped text of a table cell, or None for an empty/placeholder cell"""
+    if value is None or pd.isna(value):
+        return None
+    text = str(value).strip()
+    if text.lower() in _EMPTY_CELL_VALUES:
+        return None
+    return text
+
+
+def _resolve_field_positions(columns) -> Dict[str, List[int]]:
+    """Map each profile field to its column positions, best alias first.
+
+    Args:
+        columns: Normalized table column names
+
+    Returns:
+        Dict of profile field -> list of column positions
+    """
+    ranked = {}
+    for pos, col in enumerate(columns):
+        mapped = _COLUMN_TO_FIELD.get(col)
+        if mapped:
+            field, rank = mapped
+            ranked.setdefault(field, []).append((rank, pos))
+    return {field: [pos for _, pos in sorted(entries)] for field, entries in ranked.items()}
+
+
+_NON_DECIMAL_RE = re.compile(r'[^0-9.]')
+_NON_DIGIT_RE = re.compile(r'[^0-9]')
+
+
+def _to_float(val) -> Optional[float]:
+    """Parse the number out of a value like '4.5 years', or None"""
+    try:
+        return float(_NON_DECIMAL_RE.sub('', str(val))) if val else None
+    except ValueError:
+        return None
+
+
+def _to_int(val) -> Optional[int]:
+    """Parse the digits out of a value like '30 days', or None"""
+    try:
+        return int(_NON_DIGIT_RE.sub('', str(val))) if val else None
+    except ValueError:
+        return None
+
+
+# Numeric dates as "<digits><sep><digits><sep><digits>" with one separator kind
+_NUMERIC_DATE_RE = re.compile(r'(\d+)([-/])(\d+)\2(\d+)')
+# (separator, year/month/day part indexes, year digits) in the order the formats are tried:
+# %Y-%m-%d, %d-%m-%Y, %d/%m/%Y, %m/%d/%Y, %d-%m-%y, %d/%m/%y, %Y/%m/%d
+_NUMERIC_DATE_FORMATS = (
+    ('-', 0, 1, 2, 4),
+    ('-', 2, 1, 0, 4),
+    ('/', 2, 1, 0, 4),
+    ('/', 2, 0, 1, 4),
+    ('-', 2, 1, 0, 2),
+    ('/', 2, 1, 0, 2),
+    ('/', 0, 1, 2, 4),
+)
+
+
+def _parse_numeric_date(value: str) -> Optional[date]:
+    """Parse a numeric date the way trying each strptime format in turn would.
+
+    Month and day take one or two digits, the year four (or two, pivoting at
+    69 like %y), and the first format giving a valid date wins.
+
+    Args:
+        value: Stripped date string
+
+    Returns:
+        The date, or None if no numeric format fits
+    """
+    match = _NUMERIC_DATE_RE.fullmatch(value)
+    if not match:
+        return None
+    parts = (match.group(1), match.group(3), match.group(4))
+    separator = match.group(2)
+    for fmt_separator, year_idx, month_idx, day_idx, year_digits in _NUMERIC_DATE_FORMATS:
+        if (fmt_separator != separator or len(parts[year_idx]) != year_digits
+                or len(parts[month_idx]) > 2 or len(parts[day_idx]) > 2):
+            continue
+        year = int(parts[year_idx])
+        if year_digits == 2:
+            year += 2000 if year < 69 else 1900
+        try:
+            return date(year, int(parts[month_idx]), int(parts[day_idx]))
+        except ValueError:
+            continue
+    return None
+
+
+# Profile column -> (coercion or None, profile data keys in priority order).
+# The first truthy value among the keys is used, covering old and new field names.
+_PROFILE_VALUE_SCHEMA = (
+    ('total_experience', _to_float, ('total_experience',)),
+    ('relevant_experience', _to_float, ('relevant_experience',)),
+    ('current_company', None, ('current_company',)),
+    ('ctc_current', _to_float, ('ctc_current', 'current_ctc')),
+    ('ctc_expected', _to_float, ('ctc_expected', 'expected_ctc')),
+    ('notice_period_days', _to_int, ('notice_period_days', 'notice_period')),
+    ('location', None, ('location', 'current_location')),
+    ('education', None, ('education', 'qualification')),
+    ('key_skills', None, ('key_skills', 'skills')),
+    ('source', None, ('source',)),
+    ('contact_no', None, ('contact_no',)),
+    ('candidate_email', None, ('candidate_email',)),
+    ('oracle_id', None, ('oracle_id',)),
+    ('offer_in_hand', None, ('offer_in_hand',)),
+    ('availability', None, ('availability',)),
+)
+
+
+def _build_profile_values(profile_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert raw profile data to Profile column values per _PROFILE_VALUE_SCHEMA.
+
+    Args:
+        profile_data: Raw profile data extracted from an email or upload
+
+    Returns:
+        Dict of Profile column -> value
+    """
+    values = {}
+    for column, coerce, keys in _PROFILE_VALUE_SCHEMA:
+        value = None
+        for key in keys:
+            value = profile_data.get(key)
+            if value:
+                break
+        values[column] = coerce(value) if coerce else value
+    return values
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_profile_field(field: str, value: str) -> str:
+    """Clean and normalize a stripped table cell value for a profile field.
+
+    Cached because the same cell values ("30 days", "5 years", "Immediate")
+    repeat across rows and emails.
+    """
+    # Already normalized values pass through unchanged
+    normalized_re = _NORMALIZED_FIELD_RES.get(field)
+    if normalized_re is not None and normalized_re.fullmatch(value):
+        return value
+    
+    # Remove common unwanted text
+    value = _NAN_RE.sub('', value).strip()
+    
+    if not value:
+        return ''
+    
+    if field in ['ctc_current', 'ctc_expected']:
+        # Extract numeric values from CTC fields
+        # Handle formats like "4Lpa", "₹16 LPA", "25k", "4.5 lac"
+        value = value.lower().replace('₹', '').replace('rs.', '').replace('inr', '')
+        
+        # Extract numbers
+        number_match = _NUMBER_RE.search(value)
+        if number_match:
+            num = float(number_match.group(1))
+            
+            if 'k' in value:  # Convert k to lakhs
+                num = num / 100
+            elif 'lac' in value or 'lpa' in value or 'l' in value:
+                pass  # Already in lakhs
+            elif num > 100:  # Assume it's in thousands if > 100
+                num = num / 100
+            
+            return f"{num:.1f} LPA"
+        
+    elif field == 'total_experience' or field == 'relevant_experience':
+        # Normalize experience format
+        # Handle formats like "4yrs", "5.5 years", "4+ years"
+        years_match = _NUMBER_RE.search(value)
+        if years_match:
+            years = float(years_match.group(1))
+            return f"{years:.1f} years"
+            
+    elif field == 'notice_period_days':
+        # Normalize notice period
+        lowered = value.lower()
+        if 'immed' in lowered:
+            return 'Immediate'
+        
+        days_match = _DAYS_OR_MONTHS_RE.search(lowered)
+        if days_match:
+            num = int(days_match.group(1))
+            if 'month' in lowered:
+                return f"{num} months"
+            else:
+                return f"{num} days"
+                
+    elif field == 'contact_no':
+        # Clean phone numbers
+        # str.translate covers the usual ASCII input; the regex also handles Unicode digits
+        value = value.translate(_PHONE_ASCII_DELETE) if value.isascii() else _PHONE_STRIP_RE.sub('', value)
+        if len(value) >= 10:
+            return value
+            
+    return value
+
+
+@functools.lru_cache(maxsize=4096)
+def _looks_like_candidate_name(name: str) -> bool:
+    """Validate if the extracted text looks like a valid candidate name.
+
+    Cached since every candidate name is validated both when it is read from
+    the table and again when its profile is saved.
+    """
+    if len(name) < 2:
+        return False
+    
+    # Check if it's too long (likely not a name)
+    if len(name) > 100:
+        return False
+        
+    # Check if it contains email or phone patterns
+    if '@' in name or _LONG_DIGITS_RE.search(name):
+        return False
+        
+    # Check if it's mostly numbers or special characters
+    if _NUMERIC_ONLY_RE.search(name):
+        return False
+        
+    # Check if it contains common non-name patterns
+    return not _NON_NAME_RE.search(name.lower())
+
+
+# Map common column header variations - updated with actual column names from the table
+_COLUMN_NAME_MAPPINGS = {
+    'sr no': 'sr_no',
+    'candidate name': 'candidate_name',
+    'name of candidate': 'candidate_name',
+    'first name': 'first_name',
+    'last name': 'last_name',
+    'total w exp': 'total_experience',
+    'total exp': 'total_experience',
+    'total experience': 'total_experience',
+    't exp': 'total_experience',  # T.Exp from the table
+    'texp': 'total_experience',
+    'relevant exp': 'relevant_experience',
+    'relevant experience': 'relevant_experience',
+    'r exp': 'relevant_experience',  # R.Exp from the table
+    'rexp': 'relevant_experience',
+    'current company': 'current_company',
+    'current employer': 'current_company',
+    'company': 'current_company',
+    'current location': 'current_location',
+    'location': 'current_location',
+    'contact no': 'contact_no',
+    'contact number': 'contact_no',
+    'mobile no': 'contact_no',
+    'phone': 'contact_no',
+    'mobile': 'contact_no',
+    'email id': 'email_id',
+    'email': 'email_id',
+    'c ctc': 'current_ctc',  # C.CTC from the table
+    'current ctc': 'current_ctc',
+    'ctc current': 'current_ctc',
+    'cctc': 'current_ctc',
+    'e ctc': 'expected_ctc',
+    'expected ctc': 'expected_ctc',
+    'ctc expected': 'expected_ctc',
+    'ectc': 'expected_ctc',  # E.CTC from the table
+    'notice period': 'notice_period',
+    'np': 'notice_period',
+    'np days': 'notice_period',
+    'education': 'education',
+    'qualification': 'education',
+    'graduation': 'education',
+    'skills': 'skills',
+    'key skills': 'skills',
+    'technical skills': 'skills',
+    'exp in below skills': 'skills',
+    'experience in skills': 'skills',
+    'skill': 'skills',
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def _normalize_column_label(col_name: str) -> str:
+    """Normalize a table header to its standard column name.
+
+    Cached since vendors reuse the same headers across emails, which
+    spares the partial-match scan over every mapping.
+    """
+    # Convert to string and clean
+    col_name = col_name.strip().lower()
+    
+    # Remove special characters but keep spaces and dots
+    col_name = _COLUMN_STRIP_RE.sub('', col_name)
+    
+    # Handle dots in column names (e.g., "T.Exp" -> "t exp")
+    col_name = col_name.replace('.', ' ')
+    
+    # Check for exact match first
+    if col_name in _COLUMN_NAME_MAPPINGS:
+        return _COLUMN_NAME_MAPPINGS[col_name]
+    
+    # Check for partial matches
+    for key, value in _COLUMN_NAME_MAPPINGS.items():
+        if key in col_name:
+            return value
+            
+    return col_name.replace(' ', '_')
+
+
+# Substring indicators for candidate name columns, and for columns naming something else
+_NAME_COLUMN_RE = re.compile('name|candidate|consultant|person|resource')
+_NAME_COLUMN_EXCLUDE_RE = re.compile('vendor|company|firm|client|position')
+
+
+@functools.lru_cache(maxsize=1024)
+def _is_candidate_name_column(col: str) -> bool:
+    """Check whether a normalized column name holds candidate names"""
+    col_lower = col.lower()
+    return bool(_NAME_COLUMN_RE.search(col_lower)) and not _NAME_COLUMN_EXCLUDE_RE.search(col_lower)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_job_title_from_subject(subject: str) -> Tuple[Optional[str], Optional[str]]:
+    """Extract the job title from an email subject.
+
+    Replies and forwards in a thread repeat the same subject, so results are cached.
+
+    Args:
+        subject: Email subject line
+
+    Returns:
+        (job_title, name of the pattern that matched), or (None, None)
+    """
+    # Remove any Re:, Fwd:, etc. and get the original subject
+    cleaned_subject = subject.strip()
+    if cleaned_subject.startswith(_REPLY_PREFIXES):
+        cleaned_subject = _REPLY_PREFIX_RE.sub('', cleaned_subject)
+    
+    # RFH, "Title - Company - Location" and "Request for ..." formats
+    for pattern_name, pattern in _SUBJECT_TITLE_RES:
+        subject_match = pattern.search(cleaned_subject)
+        if subject_match:
+            # Clean up the job title
+            job_title = _TITLE_STRIP_RE.sub('', subject_match.group(1).strip()).strip()
+            if job_title and len(job_title) > 3:
+                return job_title, pattern_name
+    
+    # First, try to extract after ":-" (most specific pattern for your case)
+    colon_dash_match = _COLON_DASH_SUBJECT_RE.search(cleaned_subject)
+    if colon_dash_match:
+        extracted = colon_dash_match.group(1).strip()
+        # If the extracted part looks like a job title (not too long, contains technical terms)
+        if extracted and len(extracted) < 100 and not any(word in extracted.lower() for word in ['resume', 'tracker', 'sheet', 'submission']):
+            # Clean up the extracted title
+            title = _TITLE_STRIP_RE.sub('', extracted).strip()
+            if title:
+                return title, 'colon-dash'
+    
+    # Most subjects carry none of the structured markers below
+    if not _STRUCTURED_SUBJECT_ANY_RE.search(cleaned_subject):
+        return _parse_generic_job_title(cleaned_subject)
+    
+    # Try to extract after "Resume & Tracker sheet"
+    tracker_match = _TRACKER_SUBJECT_RE.search(cleaned_subject)
+    if tracker_match:
+        extracted = tracker_match.group(1).strip()
+        if extracted and len(extracted) < 100:
+            title = _TITLE_STRIP_RE.sub('', extracted).strip()
+            if title:
+                return title, 'tracker'
+    
+    # Try to extract after "Candidate Submission"
+    submission_match = _SUBMISSION_SUBJECT_RE.search(cleaned_subject)
+    if submission_match:
+        extracted = submission_match.group(1).strip()
+        if extracted and len(extracted) < 100:
+            title = _TITLE_STRIP_RE.sub('', extracted).strip()
+            if title:
+                return title, 'submission'
+    
+    # Try to extract after "Hiring Manager profile + RFH Req"
+    if _HIRING_MANAGER_SUBJECT_RE.search(cleaned_subject):
+        # For this pattern, try to extract from the end of the subject
+        # Remove the pattern and get what's left
+        remaining = _HIRING_MANAGER_SUBJECT_RE.sub('', cleaned_subject).strip()
+        if remaining:
+            title = _TITLE_STRIP_RE.sub('', remaining).strip()
+            if title and len(title) > 3:
+                return title, 'hiring manager'
+    
+    return _parse_generic_job_title(cleaned_subject)
+
+
+def _parse_generic_job_title(cleaned_subject: str) -> Tuple[Optional[str], Optional[str]]:
+    """Generic-pattern fallback of _parse_job_title_from_subject"""
+    generic_patterns = _GENERIC_TITLE_RES if _GENERIC_TITLE_ANY_RE.search(cleaned_subject) else ()
+    for pattern in generic_patterns:
+        match = pattern.search(cleaned_subject)
+        if match:
+            job_title = match.group(1).strip()
+            if job_title and len(job_title) > 3:
+                # Clean up the job title
+                job_title = _TITLE_STRIP_RE.sub('', job_title).strip()
+                if job_title:
+                    return job_title, 'generic'
+    
+    return None, None
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_job_title_text(job_title: str) -> str:
+    """Normalize a job title for duplicate detection (lowercase, no RFH prefixes or noise words)"""
+    if not job_title:
+        return ''
+    
+    # Convert to lowercase and strip
+    normalized = job_title.lower().strip()
+    
+    # Remove common prefixes/suffixes and noise
+    normalized = _TITLE_BRACKETS_RE.sub('', normalized)  # Remove leading [ and trailing ] with their spaces
+    normalized = _NON_WORD_RE.sub('', normalized)  # Remove special characters
+    normalized = _WHITESPACE_RE.sub(' ', normalized)     # Normalize whitespace
+    
+    # Remove RFH prefixes and variations
+    if normalized.startswith(_TITLE_RFH_PREFIX_STARTS):
+        for prefix in _TITLE_RFH_PREFIX_RES:
+            normalized = prefix.sub('', normalized)
+    
+    # Remove common noise words
+    normalized = _TITLE_NOISE_WORDS_RE.sub('', normalized)
+    
+    # Clean up again after removing words
+    normalized = _WHITESPACE_RE.sub(' ', normalized).strip()
+    
+    return normalized
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_sender_address(sender_info: str) -> Optional[Tuple[str, str]]:
+    """Split a '"Name" <email@domain.com>' sender string into (name, email).
+
+    Well-formed senders are sliced around the first '<' and the following '>';
+    anything else goes through _SENDER_ADDRESS_RE.
+
+    Returns:
+        (sender_name, sender_email), or None if no address could be found
+    """
+    lt = sender_info.find('<')
+    gt = sender_info.find('>', lt + 1) if lt >= 0 else -1
+    if gt > lt + 1:
+        name = sender_info[:lt].strip()
+        # Drop one surrounding quote on each side; any other quote makes the regex pick a different name span
+        if name.startswith('"'):
+            name = name[1:]
+        if name.endswith('"'):
+            name = name[:-1]
+        if '"' not in name:
+            return name.strip(), sender_info[lt + 1:gt].strip()
+    match = _SENDER_ADDRESS_RE.search(sender_info)
+    if match:
+        return match.group(1).strip(), match.group(2).strip()
+    return None
+
+
+@functools.lru_cache(maxsize=4096)
+def _clean_email_subject_text(subject: str) -> str:
+    """Strip Re:/Fw:/Fwd: style prefixes from a subject and collapse its whitespace"""
+    subject = subject.strip()
+    
+    # Remove reply/forward prefixes (case insensitive)
+    if subject[:8].lower().startswith(_SUBJECT_PREFIXES):
+        subject = _SUBJECT_PREFIX_RE.sub('', subject).strip()
+    
+    # Remove extra whitespace
+    subject = _WHITESPACE_RE.sub(' ', subject).strip()
+    
+    return subject
+
+
+# Common words ignored when comparing subjects and titles
+_SIMILARITY_STOPWORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does',
+    'did', 'will', 'would', 'could', 'should'
+})
+
+
+@functools.lru_cache(maxsize=4096)
+def _similarity_tokens(text: str) -> frozenset:
+    """Lowercased words of a subject/title, minus stopwords and words of two letters or fewer"""
+    return frozenset(
+        word.lower() for word in text.split()
+        if len(word) > 2 and word.lower() not in _SIMILARITY_STOPWORDS
+    )
+
+
+def _token_similarity(tokens1: frozenset, tokens2: frozenset) -> float:
+    """Jaccard similarity (intersection over union) of two token sets"""
+    if not tokens1 or not tokens2:
+        return 0.0
+    return len(tokens1 & tokens2) / len(tokens1 | tokens2)
+
+
+class _TitleSimilarityIndex:
+    """Inverted word index over normalized job titles for one-vs-all duplicate scoring.
+
+    Shared word/token counts against every indexed title come from one numpy
+    bincount over the posting lists of the incoming title, instead of a set
+    intersection per title in Python.
+    """
+
+    def __init__(self, titles: Optional[Dict[str, str]] = None):
+        self.titles: Dict[str, str] = {}
+        self._normalized: List[str] = []
+        self._word_counts: List[int] = []
+        self._token_counts: List[int] = []
+        self._word_postings: Dict[str, List[int]] = {}
+        self._token_postings: Dict[str, List[int]] = {}
+        for normalized, original in (titles or {}).items():
+            self.add(normalized, original)
+
+    def add(self, normalized: str, original: str) -> None:
+        """Index one title; the first original text seen for a normalized title is kept"""
+        if not normalized or normalized in self.titles:
+            return
+        self.titles[normalized] = original
+        idx = len(self._normalized)
+        self._normalized.append(normalized)
+        words = set(normalized.split())
+        tokens = _similarity_tokens(normalized)
+        self._word_counts.append(len(words))
+        self._token_counts.append(len(tokens))
+        for word in words:
+            self._word_postings.setdefault(word, []).append(idx)
+        for token in tokens:
+            self._token_postings.setdefault(token, []).append(idx)
+
+    def _shared_counts(self, postings: Dict[str, List[int]], keys) -> np.ndarray:
+        lists = [postings[key] for key in keys if key in postings]
+        if not lists:
+            return np.zeros(len(self._normalized), dtype=np.int64)
+        return np.bincount(np.concatenate(lists), minlength=len(self._normalized))
+
+    def find_similar(self, normalized: str) -> Optional[Tuple[str, float, set]]:
+        """Find the first indexed title that counts as a fuzzy duplicate.
+
+        A title matches on token Jaccard similarity above 0.85, or when both
+        titles have two or more words and share at least 80% of the shorter one.
+
+        Args:
+            normalized: Normalized incoming job title
+
+        Returns:
+            (normalized existing title, similarity, common words), or None
+        """
+        if not self._normalized:
+            return None
+        words = set(normalized.split())
+        tokens = _similarity_tokens(normalized)
+        common_tokens = self._shared_counts(self._token_postings, tokens)
+        union = np.asarray(self._token_counts) + len(tokens) - common_tokens
+        similarity = np.divide(common_tokens, union, out=np.zeros(len(union)), where=union > 0)
+        matches = similarity > 0.85
+        if len(words) >= 2:
+            common_words = self._shared_counts(self._word_postings, words)
+            word_counts = np.asarray(self._word_counts)
+            matches |= (word_counts >= 2) & (common_words > 0) & (common_words >= np.minimum(word_counts, len(words)) * 0.8)
+        hits = np.flatnonzero(matches)
+        if not hits.size:
+            return None
+        existing = self._normalized[hits[0]]
+        return existing, float(similarity[hits[0]]), words & set(existing.split())
+
+
+@functools.lru_cache(maxsize=1024)
+def _requirement_header_field(header: str) -> Optional[str]:
+    """Map a lowercased requirement-table header to its database field, if any"""
+    field_name = _REQUIREMENT_FIELD_MAPPING.get(header)
+    if field_name is not None:
+        return field_name
+    if not _REQUIREMENT_HEADER_ANY_RE.search(header):
+        return None
+    for pattern, field_name in _REQUIREMENT_FIELD_PATTERNS:
+        if pattern in header:
+            return field_name
+    return None
+
+
+# Rows fetched per round trip when streaming existing job titles for duplicate checks
+EXISTING_TITLE_BATCH_SIZE = 500
+
+_html2text_local = threading.local()
+
+
+def _get_html2text() -> html2text.HTML2Text:
+    """Return this thread's configured HTML2Text converter.
+
+    HTML2Text is a stateful HTMLParser, so one converter is kept per thread
+    rather than one per EmailProcessor.
+    """
+    converter = getattr(_html2text_local, 'converter', None)
+    if converter is None:
+        converter = html2text.HTML2Text()
+        converter.ignore_links = True
+        converter.ignore_images = True
+        converter.ignore_tables = False
+        converter.body_width = 0
+        converter.unicode_snob = True
+        converter.ul_item_mark = '-'
+        converter.emphasis_mark = '*'
+        converter.strong_mark = '**'
+        _html2text_local.converter = converter
+    return converter
+
+
+_CANDIDATE_TABLE_KEYWORDS = ('name', 'candidate', 'experience', 'company', 'ctc', 'skill')
+
+
+def _could_be_candidate_table(table) -> bool:
+    """Cheap screen on a raw <table> element before pandas builds a DataFrame"""
+    rows = table.xpath('./tr|./*/tr')
+    # Header row plus more than one data row
+    if len(rows) < 3:
+        return False
+    head_text = (rows[0].text_content() + ' ' + rows[1].text_content()).lower()
+    return any(keyword in head_text for keyword in _CANDIDATE_TABLE_KEYWORDS)
+
+
+def _read_html_tables(html_content: str, candidates_only: bool = False) -> List[pd.DataFrame]:
+    """Parse every <table> in the HTML into a DataFrame.
+
+    pandas.read_html is far slower on a document holding many tables than on
+    each table separately, so tables are split out with lxml first.
+
+    Args:
+        html_content: Raw HTML document
+        candidates_only: Skip tables that cannot hold candidate data
+
+    Returns:
+        List of DataFrames, one per parsed table
+    """
+    if lxml_html is None:
+        return pd.read_html(StringIO(html_content), header=0)
+
+    frames = []
+    for table in lxml_html.fromstring(html_content).iter('table'):
+        if candidates_only and not _could_be_candidate_table(table):
+            continue
+        table_html = lxml_html.tostring(table, encoding='unicode', with_tail=False)
+        try:
+            # Nested tables are visited on their own, so keep only the outer one
+            frames.append(pd.read_html(StringIO(table_html), header=0, flavor='lxml')[0])
+        except ValueError:
+            continue
+    return frames
+
+
+def _selectolax_text_lines(html_content: str) -> Optional[List[str]]:
+    """Extract the non-empty text lines of an HTML document with selectolax.
+
+    Args:
+        html_content: Raw HTML document
+
+    Returns:
+        Stripped text lines, or None if selectolax is unavailable or fails
+    """
+    if SelectolaxParser is None:
+        return None
+    try:
+        tree = SelectolaxParser(html_content)
+        tree.strip_tags(['style', 'script'])
+        root = tree.body or tree.root
+        if root is None:
+            return []
+        text = root.text(separator='\n', strip=True)
+    except Exception:
+        return None
+    lines = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if line:
+            lines.append(line)
+    return lines
+
+
+def _lxml_text_lines(html_content: str) -> Optional[List[str]]:
+    """Extract the non-empty text nodes of an HTML document with lxml.
+
+    Style, script and comment nodes are dropped structurally and <br> tags
+    become line breaks, matching what the BeautifulSoup path produces.
+
+    Args:
+        html_content: Raw HTML document
+
+    Returns:
+        Stripped text lines, or None if lxml is unavailable or cannot parse it
+    """
+    if lxml_html is None:
+        return None
+    try:
+        root = lxml_html.fromstring(html_content)
+    except (lxml_etree.ParserError, ValueError):
+        return None
+    lxml_etree.strip_elements(root, 'style', 'script', lxml_etree.Comment, with_tail=False)
+    lines = []
+    for text in root.itertext():
+        # <br> splits text nodes, so each node is already its own line
+        text = text.strip()
+        if text:
+            lines.append(text)
+    return lines
+
+
+# Header row, first data row, and the text nodes just before and after one table
+_RequirementTable = Tuple[List[List[str]], Optional[str], Optional[str]]
+
+
+def _lxml_requirement_tables(html_content: str) -> Optional[List[_RequirementTable]]:
+    """Read the leading rows and surrounding text of each table with lxml XPath.
+
+    Cell text is joined the same way BeautifulSoup's get_text(strip=True) does.
+
+    Args:
+        html_content: Raw HTML document
+
+    Returns:
+        One entry per table, or None if lxml is unavailable or cannot parse it
+    """
+    if lxml_html is None:
+        return None
+    try:
+        root = lxml_html.fromstring(html_content)
+    except (lxml_etree.ParserError, ValueError):
+        return None
+    tables = []
+    for table in root.xpath('//table'):
+        rows = [
+            [''.join(text.strip() for text in cell.xpath('.//text()'))
+             for cell in row.xpath('.//*[self::td or self::th]')]
+            for row in table.xpath('.//tr')[:2]
+        ]
+        before = table.xpath('preceding-sibling::text()[1]')
+        after = table.xpath('following-sibling::text()[1]')
+        tables.append((rows, before[0] if before else None, after[0] if after else None))
+    return tables
+
+
+def _soup_requirement_tables(html_content: str) -> List[_RequirementTable]:
+    """BeautifulSoup fallback for _lxml_requirement_tables"""
+    soup = BeautifulSoup(html_content, _SOUP_PARSER)
+    tables = []
+    for table in soup.find_all('table'):
+        rows = [
+            [cell.get_text(strip=True) for cell in row.find_all(['td', 'th'])]
+            for row in table.find_all('tr', limit=2)
+        ]
+        tables.append((rows, table.find_previous_sibling(string=True), table.find_next_sibling(string=True)))
+    return tables
+
+
+@functools.lru_cache(maxsize=None)
+def _get_msal_app(client_id: str, authority: str, client_secret: str) -> msal.ConfidentialClientApplication:
+    """Return a shared MSAL client per app registration.
+
+    Building the client resolves the authority over HTTP, and reusing it keeps
+    its in-memory token cache alive across processors.
+    """
+    return msal.ConfidentialClientApplication(
+        client_id,
+        authority=authority,
+        client_credential=client_secret
+    )
+
+
+# Graph access tokens per app registration: key -> (token, expires_at)
+_access_tokens: Dict[Tuple[str, str], Tuple[str, float]] = {}
+_access_token_lock = threading.Lock()
+# Refresh tokens this many seconds before they actually expire
+ACCESS_TOKEN_EXPIRY_MARGIN = 60
+
+
+def _graph_json(response: requests.Response) -> Any:
+    """Decode a Microsoft Graph response body, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            # e.g. a body that is not UTF-8; let requests detect the encoding
+            pass
+    return response.json()
+
+
+# Attachments are written off the ingest thread; identical content is stored once
+ATTACHMENT_WRITE_WORKERS = 4
+_attachment_writer = ThreadPoolExecutor(max_workers=ATTACHMENT_WRITE_WORKERS, thread_name_prefix='attachment-writer')
+# SHA-256 of attachment bytes -> (path it was saved to, its write), least recently used first
+ATTACHMENT_PATH_CACHE_SIZE = 1024
+_attachment_paths: 'OrderedDict[str, Tuple[str, Future]]' = OrderedDict()
+_attachment_paths_lock = threading.Lock()
+
+
+def _write_attachment(file_path: str, data: bytes, digest: str) -> None:
+    """Write attachment bytes to disk, forgetting the path if the write fails."""
+    try:
+        with open(file_path, 'wb') as f:
+            f.write(data)
+    except OSError:
+        with _attachment_paths_lock:
+            cached = _attachment_paths.get(digest)
+            if cached and cached[0] == file_path:
+                del _attachment_paths[digest]
+        raise
+
+
+@functools.lru_cache(maxsize=None)
+def _get_resume_parser() -> ResumeParser:
+    """Return the shared ResumeParser (loading the spaCy model is expensive)."""
+    return ResumeParser()
+
+
 class EmailProcessor:
     def __init__(self, session: Optional[Session] = None):
-        self.html2text = html2text.HTML2Text()
-        self.html2text.ignore_links = True
-        self.html2text.ignore_images = True
-        self.html2text.ignore_tables = False
-        self.html2text.body_width = 0
-        self.html2text.unicode_snob = True
-        self.html2text.ul_item_mark = '-'
-        self.html2text.emphasis_mark = '*'
-        self.html2text.strong_mark = '**'
         try:
-            self.resume_parser = ResumeParser()
+            self.resume_parser = _get_resume_parser()
         except Exception as e:
             current_app.logger.warning(f"Resume parser initialization failed: {str(e)}")
             self.resume_parser = None
@@ -50,6 +1226,13 @@ class EmailProcessor:
         self.scope = Config.MS_SCOPE
         self.user_email = Config.MS_USER_EMAIL
         self.session = session or db.session
+        # Next student_id number for this processor's batch, read on first use
+        self._next_student_num = None
+
+    @property
+    def html2text(self) -> html2text.HTML2Text:
+        """Shared per-thread HTML to text converter"""
+        return _get_html2text()
 
     def extract_profiles_from_html(self, html_content):
         """Extract candidate profiles from HTML tables in email content"""
@@ -64,7 +1247,7 @@ class EmailProcessor:
             # Method 1: Try pandas.read_html with different configurations
             try:
                 # Try with header=0 to use first row as column names
-                tables = pd.read_html(StringIO(cleaned_html), header=0)
+                tables = _read_html_tables(cleaned_html, candidates_only=True)
                 current_app.logger.info(f"pandas.read_html found {len(tables)} tables")
                 
                 # Filter tables to find candidate data tables
@@ -75,8 +1258,7 @@ class EmailProcessor:
                     first_row_str = ' '.join([str(val) for val in table.iloc[0] if pd.notna(val)]).lower() if not table.empty else ''
                     
                     # Look for candidate-related keywords
-                    has_candidate_keywords = any(keyword in table_str + first_row_str for keyword in 
-                                               ['name', 'candidate', 'experience', 'company', 'ctc', 'skill'])
+                    has_candidate_keywords = any(keyword in table_str + first_row_str for keyword in _CANDIDATE_TABLE_KEYWORDS)
                     
                     # Check table size (should have multiple rows and columns)
                     has_good_size = table.shape[0] > 1 and table.shape[1] > 3
@@ -95,92 +1277,7 @@ class EmailProcessor:
 
             # Process each table
             for df in tables:
-                if df.empty:
-                    continue
-                    
-                # Normalize column names and log original columns for debugging
-                original_columns = list(df.columns)
-                current_app.logger.info(f"Original columns: {original_columns}")
-                
-                # Normalize column names
-                normalized_columns = [self._normalize_column_name(str(col)) for col in df.columns]
-                df.columns = normalized_columns
-                current_app.logger.info(f"Normalized columns: {normalized_columns}")
-                
-                # Handle duplicate column names by renaming them
-                df.columns = pd.Index([f"{col}_{i}" if list(df.columns).count(col) > 1 and list(df.columns)[:i+1].count(col) > 1 else col 
-                                     for i, col in enumerate(df.columns)])
-                
-                # Look for candidate name columns with more variations
-                name_indicators = ['name', 'candidate', 'consultant', 'person', 'resource']
-                exclude_indicators = ['vendor', 'company', 'firm', 'client', 'position']
-                
-                def is_candidate_name_col(col):
-                    col_lower = str(col).lower()
-                    has_name = any(indicator in col_lower for indicator in name_indicators)
-                    has_exclude = any(indicator in col_lower for indicator in exclude_indicators)
-                    return has_name and not has_exclude
-                
-                name_cols = [col for col in df.columns if is_candidate_name_col(col)]
-                
-                # If we have first_name and last_name columns, prioritize them
-                if 'first_name' in df.columns and 'last_name' in df.columns:
-                    name_cols = ['first_name', 'last_name'] + [col for col in name_cols if col not in ['first_name', 'last_name']]
-                
-                if name_cols:
-                    current_app.logger.info(f"Found candidate name columns: {name_cols}")
-                    
-                    # Process each row
-                    for idx, row in df.iterrows():
-                        try:
-                            # Skip header-like rows
-                            row_values = [str(v) for v in row.values if pd.notna(v)]
-                            row_str = ' '.join(row_values)
-                            if any(header_word in row_str.lower() for header_word in ['candidate', 'name', 'experience', 'skills']):
-                                if idx == 0:  # Allow first row as it might be header
-                                    continue
-                            
-                            # Extract candidate name
-                            candidate_name = None
-                            
-                            # Handle first_name and last_name separately
-                            if 'first_name' in name_cols and 'last_name' in name_cols:
-                                first_name = row.get('first_name', '') if 'first_name' in row.index else ''
-                                last_name = row.get('last_name', '') if 'last_name' in row.index else ''
-                                
-                                if pd.notna(first_name) and pd.notna(last_name):
-                                    candidate_name = f"{str(first_name).strip()} {str(last_name).strip()}".strip()
-                                elif pd.notna(first_name):
-                                    candidate_name = str(first_name).strip()
-                                elif pd.notna(last_name):
-                                    candidate_name = str(last_name).strip()
-                            
-                            # If no name found yet, try other name columns
-                            if not candidate_name:
-                                for col in name_cols:
-                                    if col in row.index and col not in ['first_name', 'last_name']:
-                                        value = row[col]
-                                        if pd.notna(value) and str(value).strip():
-                                            candidate_name = str(value).strip()
-                                            break
-                            
-                            # Validate the extracted name
-                            if candidate_name and self._is_valid_candidate_name(candidate_name):
-                                pass  # Name is valid, continue
-                            else:
-                                continue  # Skip this row if name is invalid
-                            
-                            if not candidate_name or candidate_name.lower() in ['name', 'candidate', '']:
-                                continue
-                                
-                            # Extract profile data with improved field mapping
-                            profile = self._extract_profile_from_row(row, candidate_name)
-                            
-                            if profile and profile.get('candidate_name'):
-                                profiles.append(profile)
-                        except Exception as e:
-                            current_app.logger.error(f"Error processing row {idx}: {str(e)}")
-                            continue
+                profiles.extend(self._extract_profiles_from_table(df))
             
             current_app.logger.info(f"Extracted {len(profiles)} profiles from HTML tables")
             return profiles
@@ -189,109 +1286,133 @@ class EmailProcessor:
             current_app.logger.error(f"Error extracting profiles from HTML: {str(e)}")
             return profiles
 
+    def _extract_profiles_from_table(self, df: pd.DataFrame) -> List[dict]:
+        """Extract candidate profiles from one candidate table
+
+        Args:
+            df: Table parsed by pandas.read_html
+
+        Returns:
+            List of profile data dicts
+        """
+        profiles = []
+        if df.empty:
+            return profiles
+            
+        # Normalize column names and log original columns for debugging
+        original_columns = list(df.columns)
+        current_app.logger.info(f"Original columns: {original_columns}")
+        
+        # Normalize column names
+        normalized_columns = [self._normalize_column_name(str(col)) for col in df.columns]
+        current_app.logger.info(f"Normalized columns: {normalized_columns}")
+        
+        # Handle duplicate column names by renaming repeats after their position
+        seen_columns = set()
+        unique_columns = []
+        for i, col in enumerate(normalized_columns):
+            unique_columns.append(f"{col}_{i}" if col in seen_columns else col)
+            seen_columns.add(col)
+        df.columns = pd.Index(unique_columns)
+        # Plain dict for column membership and positional row access
+        positions = {col: pos for pos, col in enumerate(unique_columns)}
+        
+        # Look for candidate name columns with more variations
+        name_cols = [col for col in unique_columns if _is_candidate_name_column(str(col))]
+        
+        # If we have first_name and last_name columns, prioritize them
+        if 'first_name' in positions and 'last_name' in positions:
+            name_cols = ['first_name', 'last_name'] + [col for col in name_cols if col not in ['first_name', 'last_name']]
+        
+        if name_cols:
+            current_app.logger.info(f"Found candidate name columns: {name_cols}")
+            
+            # Resolve column positions once per table and walk plain object rows
+            # instead of materializing a Series per row with iterrows()
+            field_positions = _resolve_field_positions(unique_columns)
+            name_positions = [positions[col] for col in name_cols if col in positions and col not in ('first_name', 'last_name')]
+            first_pos = positions.get('first_name')
+            last_pos = positions.get('last_name')
+            split_name = 'first_name' in name_cols and 'last_name' in name_cols
+
+            # Process each row
+            for idx, row in enumerate(df.to_numpy(dtype=object)):
+                try:
+                    # Skip a header-like first row
+                    if idx == 0:
+                        row_str = ' '.join(str(v) for v in row if pd.notna(v)).lower()
+                        if any(header_word in row_str for header_word in ['candidate', 'name', 'experience', 'skills']):
+                            continue
+                    
+                    # Extract candidate name
+                    candidate_name = None
+                    
+                    # Handle first_name and last_name separately
+                    if split_name:
+                        first_name = row[first_pos] if first_pos is not None else ''
+                        last_name = row[last_pos] if last_pos is not None else ''
+                        
+                        if pd.notna(first_name) and pd.notna(last_name):
+                            candidate_name = f"{str(first_name).strip()} {str(last_name).strip()}".strip()
+                        elif pd.notna(first_name):
+                            candidate_name = str(first_name).strip()
+                        elif pd.notna(last_name):
+                            candidate_name = str(last_name).strip()
+                    
+                    # If no name found yet, try other name columns
+                    if not candidate_name:
+                        for pos in name_positions:
+                            value = row[pos]
+                            if pd.notna(value) and str(value).strip():
+                                candidate_name = str(value).strip()
+                                break
+                    
+                    # Validate the extracted name
+                    if candidate_name and self._is_valid_candidate_name(candidate_name):
+                        pass  # Name is valid, continue
+                    else:
+                        continue  # Skip this row if name is invalid
+                    
+                    if not candidate_name or candidate_name.lower() in ['name', 'candidate', '']:
+                        continue
+                        
+                    # Extract profile data with improved field mapping
+                    profile = self._extract_profile_from_row(row, candidate_name, field_positions)
+                    
+                    if profile and profile.get('candidate_name'):
+                        profiles.append(profile)
+                except Exception as e:
+                    current_app.logger.error(f"Error processing row {idx}: {str(e)}")
+                    continue
+
+        return profiles
+
     def _normalize_column_name(self, col_name: str) -> str:
         """Normalize column names to standard format"""
         if not col_name or pd.isna(col_name):
             return ''
             
-        # Convert to string and clean
-        col_name = str(col_name).strip().lower()
-        
-        # Remove special characters but keep spaces and dots
-        col_name = re.sub(r'[^\w\s\.]', '', col_name)
-        
-        # Handle dots in column names (e.g., "T.Exp" -> "t exp")
-        col_name = col_name.replace('.', ' ')
-        
-        # Map common variations - updated with actual column names from the table
-        mappings = {
-            'sr no': 'sr_no',
-            'candidate name': 'candidate_name',
-            'name of candidate': 'candidate_name', 
-            'first name': 'first_name',
-            'last name': 'last_name',
-            'total w exp': 'total_experience',
-            'total exp': 'total_experience',
-            'total experience': 'total_experience',
-            't exp': 'total_experience',  # T.Exp from the table
-            'texp': 'total_experience',
-            'relevant exp': 'relevant_experience',
-            'relevant experience': 'relevant_experience',
-            'r exp': 'relevant_experience',  # R.Exp from the table
-            'rexp': 'relevant_experience',
-            'current company': 'current_company',
-            'current employer': 'current_company',
-            'company': 'current_company',
-            'current location': 'current_location',
-            'location': 'current_location',
-            'contact no': 'contact_no',
-            'contact number': 'contact_no',
-            'mobile no': 'contact_no',
-            'phone': 'contact_no',
-            'mobile': 'contact_no',
-            'email id': 'email_id',
-            'email': 'email_id',
-            'c ctc': 'current_ctc',
-            'current ctc': 'current_ctc',
-            'ctc current': 'current_ctc',
-            'c ctc': 'current_ctc',  # C.CTC from the table
-            'cctc': 'current_ctc',
-            'e ctc': 'expected_ctc',
-            'expected ctc': 'expected_ctc',
-            'ctc expected': 'expected_ctc',
-            'ectc': 'expected_ctc',  # E.CTC from the table
-            'notice period': 'notice_period',
-            'np': 'notice_period',
-            'np days': 'notice_period',
-            'education': 'education',
-            'qualification': 'education',
-            'graduation': 'education',
-            'skills': 'skills',
-            'key skills': 'skills',
-            'technical skills': 'skills',
-            'exp in below skills': 'skills',
-            'experience in skills': 'skills',
-            'skill': 'skills',
-        }
-        
-        # Check for exact match first
-        if col_name in mappings:
-            return mappings[col_name]
-        
-        # Check for partial matches
-        for key, value in mappings.items():
-            if key in col_name:
-                return value
-                
-        return col_name.replace(' ', '_')
+        return _normalize_column_label(str(col_name))
 
-    def _extract_profile_from_row(self, row, candidate_name: str) -> dict:
-        """Extract profile data from a table row"""
+    def _extract_profile_from_row(self, row, candidate_name: str, field_positions: Dict[str, List[int]]) -> dict:
+        """Extract profile data from a table row
+
+        Args:
+            row: Row values in column order
+            candidate_name: Already validated candidate name
+            field_positions: Profile field -> candidate column positions, in priority order
+
+        Returns:
+            Profile data dict
+        """
         profile = {'candidate_name': candidate_name}
         
-        # Field mappings with multiple possible column names - using database model field names
-        field_mappings = {
-            'total_experience': ['total_experience', 'total_exp', 'total_w_exp', 'exp', 't_exp'],
-            'relevant_experience': ['relevant_experience', 'relevant_exp', 'r_exp'],
-            'current_company': ['current_company', 'company', 'current_employer'],
-            'ctc_current': ['current_ctc', 'c_ctc', 'ctc_current', 'current_salary'],
-            'ctc_expected': ['expected_ctc', 'e_ctc', 'ctc_expected', 'expected_salary'],
-            'notice_period_days': ['notice_period', 'np', 'np_days'],
-            'location': ['current_location', 'location'],
-            'education': ['education', 'qualification', 'graduation'],
-            'key_skills': ['skills', 'key_skills', 'technical_skills', 'skill'],
-            'contact_no': ['contact_no', 'contact_number', 'mobile_no', 'phone', 'mobile'],
-            'email_id': ['email_id', 'email'],
-        }
-        
-        for field, possible_cols in field_mappings.items():
+        for field, positions in field_positions.items():
             value = None
-            for col in possible_cols:
-                if col in row.index:
-                    val = row.get(col)
-                    if pd.notna(val) and str(val).strip() and str(val).strip().lower() not in ['nan', '', '-', 'na']:
-                        value = str(val).strip()
-                        break
+            for pos in positions:
+                value = _cell_text(row[pos])
+                if value:
+                    break
             
             if value:
                 # Clean and normalize the value
@@ -301,116 +1422,18 @@ class EmailProcessor:
 
     def _clean_and_normalize_field_value(self, field: str, value: str) -> str:
         """Clean and normalize field values"""
-        if not value or pd.isna(value):
-            return ''
-            
-        value = str(value).strip()
-        
-        # Remove common unwanted text
-        value = re.sub(r'(?i)\b(nan|na|n/a|nil|null)\b', '', value).strip()
-        
+        value = _cell_text(value)
         if not value:
             return ''
-        
-        if field in ['ctc_current', 'ctc_expected']:
-            # Extract numeric values from CTC fields
-            # Handle formats like "4Lpa", "₹16 LPA", "25k", "4.5 lac"
-            value = value.lower().replace('₹', '').replace('rs.', '').replace('inr', '')
-            
-            # Extract numbers
-            number_match = re.search(r'(\d+(?:\.\d+)?)', value)
-            if number_match:
-                num = float(number_match.group(1))
-                
-                if 'k' in value:  # Convert k to lakhs
-                    num = num / 100
-                elif 'lac' in value or 'lpa' in value or 'l' in value:
-                    pass  # Already in lakhs
-                elif num > 100:  # Assume it's in thousands if > 100
-                    num = num / 100
-                
-                return f"{num:.1f} LPA"
-            
-        elif field == 'total_experience' or field == 'relevant_experience':
-            # Normalize experience format
-            # Handle formats like "4yrs", "5.5 years", "4+ years"
-            years_match = re.search(r'(\d+(?:\.\d+)?)', value)
-            if years_match:
-                years = float(years_match.group(1))
-                return f"{years:.1f} years"
-                
-        elif field == 'notice_period_days':
-            # Normalize notice period
-            if 'immediate' in value.lower() or 'immed' in value.lower():
-                return 'Immediate'
             
-            days_match = re.search(r'(\d+)\s*(?:day|month)', value.lower())
-            if days_match:
-                num = int(days_match.group(1))
-                if 'month' in value.lower():
-                    return f"{num} months"
-                else:
-                    return f"{num} days"
-                    
-        elif field == 'contact_no':
-            # Clean phone numbers
-            value = re.sub(r'[^\d+\-\s]', '', value)
-            value = re.sub(r'\s+', '', value)
-            if len(value) >= 10:
-                return value
-                
-        return value
+        return _normalize_profile_field(field, value)
 
     def _is_valid_candidate_name(self, name: str) -> bool:
         """Validate if the extracted text looks like a valid candidate name"""
-        if not name or len(name) < 2:
-            return False
-        
-        # Check if it's too long (likely not a name)
-        if len(name) > 100:
+        if not name:
             return False
             
-        # Check if it contains email or phone patterns
-        if '@' in name or re.search(r'\d{10,}', name):
-            return False
-            
-        # Check if it's mostly numbers or special characters
-        if re.search(r'^[\d\s\-\+\(\)\.]+$', name):
-            return False
-            
-        # Check if it contains common non-name patterns
-        non_name_patterns = [
-            r'www\.',
-            r'\.com',
-            r'\.in',
-            r'http',
-            r'toll.?free',
-            r'pvt\.?\s*ltd',
-            r'limited',
-            r'corporation',
-            r'company',
-            r'technologies',
-            r'solutions',
-            r'services',
-            r'systems',
-            r'floor',
-            r'building',
-            r'road',
-            r'street',
-            r'mumbai',
-            r'bangalore',
-            r'delhi',
-            r'pune',
-            r'hyderabad',
-            r'chennai',
-            r'kolkata'
-        ]
-        
-        for pattern in non_name_patterns:
-            if re.search(pattern, name.lower()):
-                return False
-                
-        return True
+        return _looks_like_candidate_name(name)
 
     def _normalize_field_name(self, field: str) -> str:
         """Normalize field names from email to match database fields"""
@@ -418,7 +1441,7 @@ class EmailProcessor:
             return ''
             
         field = field.lower().strip()
-        field = re.sub(r'[^a-z0-9\s_]', '', field)  # Remove special chars except underscore
+        field = _FIELD_STRIP_RE.sub('', field)  # Remove special chars except underscore
         field = field.replace('**', '')  # Remove markdown bold
         
         # Map common variations to our database fields
@@ -472,24 +1495,15 @@ class EmailProcessor:
             return None
             
         # Remove image URLs and markdown links
-        value = re.sub(r'\[!\[.*?\]\(.*?\)\]\(.*?\)', '', value)
-        value = re.sub(r'!\[.*?\]\(.*?\)', '', value)
-        value = re.sub(r'\[.*?\]\(.*?\)', '', value)
+        for pattern in _MARKDOWN_LINK_RES:
+            value = pattern.sub('', value)
         
         # Remove email signatures and disclaimers
-        signature_patterns = [
-            r'---.*$',  # Common signature separator
-            r'Disclaimer:.*$',
-            r'This email.*confidential.*$',
-            r'\*\*.*Ltd\*\*.*$',  # Company names in bold
-            r'Human Resource.*$'
-        ]
-        
-        for pattern in signature_patterns:
-            value = re.sub(pattern, '', value, flags=re.IGNORECASE | re.MULTILINE | re.DOTALL)
+        for pattern in _SIGNATURE_RES:
+            value = pattern.sub('', value)
         
         # Clean up whitespace
-        value = re.sub(r'\s+', ' ', value).strip()
+        value = _WHITESPACE_RE.sub(' ', value).strip()
         
         return value if value else None
 
@@ -502,8 +1516,8 @@ class EmailProcessor:
         
         if field in ['total_experience', 'relevant_experience']:
             # Extract years and months
-            years_match = re.search(r'(\d+(?:\.\d+)?)\s*(?:year|yr)', value.lower())
-            months_match = re.search(r'(\d+)\s*(?:month|mon)', value.lower())
+            years_match = _YEARS_RE.search(value.lower())
+            months_match = _MONTHS_RE.search(value.lower())
             
             years = float(years_match.group(1)) if years_match else 0
             months = float(months_match.group(1))/12 if months_match else 0
@@ -517,7 +1531,7 @@ class EmailProcessor:
                 return '0'
             
             # Check for date format
-            date_match = re.search(r'\d{1,2}(?:st|nd|rd|th)?\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*(?:\s+\d{4})?', value)
+            date_match = _NOTICE_DATE_RE.search(value)
             if date_match:
                 try:
                     # Parse the date and calculate days remaining
@@ -530,11 +1544,11 @@ class EmailProcessor:
             
             # Extract numeric values
             days = 0
-            months_match = re.search(r'(\d+)\s*month', value.lower())
+            months_match = _MONTH_COUNT_RE.search(value.lower())
             if months_match:
                 days += int(months_match.group(1)) * 30
             
-            days_match = re.search(r'(\d+)\s*day', value.lower())
+            days_match = _DAY_COUNT_RE.search(value.lower())
             if days_match:
                 days += int(days_match.group(1))
             
@@ -542,7 +1556,7 @@ class EmailProcessor:
             
         elif field in ['ctc_current', 'ctc_expected']:
             # Extract numeric value and convert to lakhs
-            match = re.search(r'(\d+(?:\.\d+)?)\s*(?:lac|lakh|lpa|l)', value.lower())
+            match = _LAKHS_RE.search(value.lower())
             if match:
                 return f"{float(match.group(1)):.2f} LPA"
             return value
@@ -550,31 +1564,46 @@ class EmailProcessor:
         elif field == 'key_skills':
             # Clean and standardize skills list
             skills = []
-            for skill in re.split(r'[,|;]', value):
+            for skill in _SKILL_SPLIT_RE.split(value):
                 skill = skill.strip()
                 # Remove ratings if present
-                skill = re.sub(r'\s*-\s*\d+(?:\.\d+)?\s*$', '', skill)
+                skill = _SKILL_RATING_RE.sub('', skill)
                 if skill and skill != '---':
                     skills.append(skill)
             return ', '.join(skills)
             
         return value
 
+    def _find_existing_profiles(self, candidate_names) -> Dict[str, Profile]:
+        """Look up existing profiles for a batch of candidate names in one query
+
+        Args:
+            candidate_names: Candidate names to match case-insensitively
+
+        Returns:
+            Lowercased candidate name -> first matching profile
+        """
+        names = {name.lower() for name in candidate_names if name}
+        if not names:
+            return {}
+        found: Dict[str, Profile] = {}
+        for profile in Profile.query.filter(func.lower(Profile.candidate_name).in_(names)):
+            found.setdefault(profile.candidate_name.lower(), profile)
+        return found
+
     def _find_existing_profile(self, profile_data: Dict[str, Any]) -> Optional[Profile]:
         """Find existing profile by candidate name and other identifiers"""
-        if not profile_data.get('candidate_name'):
+        candidate_name = profile_data.get('candidate_name')
+        if not candidate_name:
             return None
 
-        # Try to find by exact name match
-        profile = Profile.query.filter(
-            Profile.candidate_name.ilike(profile_data['candidate_name'])
-        ).first()
-
+        # Try to find by exact (case-insensitive) name match
+        profile = self._find_existing_profiles([candidate_name]).get(candidate_name.lower())
         if profile:
             return profile
 
         # If no exact match, try fuzzy matching using similar names
-        name_parts = profile_data['candidate_name'].lower().split()
+        name_parts = candidate_name.lower().split()
         if len(name_parts) > 1:
             # Try matching first name + last name in different combinations
             for i in range(len(name_parts)-1):
@@ -588,26 +1617,30 @@ class EmailProcessor:
         return None
 
     def _generate_student_id(self):
-        """Generate a unique student ID with retry logic to prevent duplicates"""
-        from app.models.profile import Profile
+        """Generate a unique student ID with retry logic to prevent duplicates
+
+        The highest existing student_id is read once per processor and then
+        incremented locally for the rest of the batch. Callers reset the counter
+        when they roll back, so IDs of uncommitted profiles are handed out again.
+        """
         max_retries = 10
         
         for attempt in range(max_retries):
             try:
-                # Get the highest existing student_id and increment
-                last_profile = Profile.query.order_by(Profile.student_id.desc()).first()
-                if last_profile and last_profile.student_id and last_profile.student_id.startswith('STU'):
+                if self._next_student_num is None:
+                    # Get the highest existing student_id and increment
+                    last_student_id = Profile.query.with_entities(Profile.student_id).filter(
+                        Profile.student_id.like('STU%')
+                    ).order_by(Profile.student_id.desc()).limit(1).scalar()
                     try:
-                        last_num = int(last_profile.student_id[3:])
-                        next_num = last_num + 1 + attempt  # Add attempt to avoid conflicts
+                        self._next_student_num = int(last_student_id[3:]) + 1 if last_student_id else 1
                     except Exception:
-                        next_num = 1 + attempt
-                else:
-                    next_num = 1 + attempt
+                        self._next_student_num = 1
                 
-                student_id = f'STU{next_num:03d}'
+                student_id = f'STU{self._next_student_num:03d}'
+                self._next_student_num += 1
                 
-                # Check if this ID already exists
+                # Check if this ID already exists (another writer may have taken it)
                 existing = Profile.query.filter_by(student_id=student_id).first()
                 if not existing:
                     return student_id
@@ -622,27 +1655,79 @@ class EmailProcessor:
     
 
 
+    def _prepare_profile_values(self, profile_data: Dict[str, Any]) -> Optional[Tuple[str, str, str, Dict[str, Any]]]:
+        """Validate the candidate name and convert profile data to Profile column values
+
+        Args:
+            profile_data: Raw profile data extracted from an email or upload
+
+        Returns:
+            (candidate_name, lookup_email, contact_no, new_data), or None if the name is invalid
+        """
+        candidate_name = profile_data.get('candidate_name') or profile_data.get('name_of_candidate')
+        if not candidate_name:
+            current_app.logger.warning("No candidate name found in profile data")
+            return None
+            
+        # Validate and clean candidate name
+        candidate_name = str(candidate_name).strip()
+        if not self._is_valid_candidate_name(candidate_name):
+            current_app.logger.warning(f"Invalid candidate name: {candidate_name}")
+            return None
+            
+        # Truncate candidate name if too long for database
+        if len(candidate_name) > 100:
+            candidate_name = candidate_name[:100]
+
+        # Enhanced duplicate detection - check by contact, email, and name
+        contact_no = profile_data.get('contact_no', '').strip()
+        profile_email_id = profile_data.get('email_id', '').strip()
+        lookup_email = profile_email_id if (profile_email_id and '@' in str(profile_email_id)) else ''
+
+        # Prepare new data for comparison - handle both old and new field names
+        new_data = _build_profile_values(profile_data)
+        new_data['email_id'] = lookup_email or None
+        return candidate_name, lookup_email, contact_no, new_data
+
+    def _apply_profile_updates(self, profile: Profile, new_data: Dict[str, Any], candidate_name: str, from_table: bool) -> bool:
+        """Copy changed values onto an existing profile, protecting key_skills from being overwritten with empty values
+
+        Returns:
+            True if any field was changed
+        """
+        log = current_app.logger
+        # Read loaded column values straight from the instance state instead of
+        # going through the instrumented attribute for every field
+        state = profile.__dict__
+        current = {k: state[k] if k in state else getattr(profile, k) for k in new_data}
+        changes = {k: v for k, v in new_data.items() if k != 'key_skills' and current[k] != v}
+        
+        # Special handling for key_skills - only update if data comes from table extraction
+        if 'key_skills' in new_data:
+            v = new_data['key_skills']
+            current_value = current['key_skills']
+            if from_table and v and v.strip() and (not current_value or current_value.strip() != v.strip()):
+                log.info(f"Updating key_skills for {candidate_name} (from table): '{current_value}' -> '{v}'")
+                changes['key_skills'] = v
+            elif not from_table and v and v.strip():
+                log.info(f"Skipping key_skills update for {candidate_name} (not from table): '{v}'")
+            elif v and v.strip() and current_value and current_value.strip() == v.strip():
+                log.info(f"key_skills already match for {candidate_name}: '{v}'")
+            elif not v or not v.strip():
+                log.info(f"Skipping empty key_skills update for {candidate_name}")
+        
+        for k, v in changes.items():
+            setattr(profile, k, v)
+        return bool(changes)
+
     def _create_or_update_profile(self, profile_data: Dict[str, Any], email_id: str, from_table: bool = True) -> Optional[Profile]:
         """Create or update a profile record with correct model fields and types. Prevent duplicates and only update if data changes."""
+        log = current_app.logger
         try:
-            candidate_name = profile_data.get('candidate_name') or profile_data.get('name_of_candidate')
-            if not candidate_name:
-                current_app.logger.warning("No candidate name found in profile data")
+            prepared = self._prepare_profile_values(profile_data)
+            if not prepared:
                 return None
-                
-            # Validate and clean candidate name
-            candidate_name = str(candidate_name).strip()
-            if not self._is_valid_candidate_name(candidate_name):
-                current_app.logger.warning(f"Invalid candidate name: {candidate_name}")
-                return None
-                
-            # Truncate candidate name if too long for database
-            if len(candidate_name) > 100:
-                candidate_name = candidate_name[:100]
-
-            # Enhanced duplicate detection - check by contact, email, and name
-            contact_no = profile_data.get('contact_no', '').strip()
-            profile_email_id = profile_data.get('email_id', '').strip()
+            candidate_name, profile_email_id, contact_no, new_data = prepared
             
             # Check for duplicates based on the logic:
             # 1. If email is same AND contact is same → It's a duplicate
@@ -652,130 +1737,196 @@ class EmailProcessor:
             profile = None
             
             # Check for duplicates by email OR contact
-            if profile_email_id and '@' in str(profile_email_id):
+            if profile_email_id:
                 # Check by email
                 profile = Profile.query.filter(Profile.email_id == profile_email_id).first()
                 if profile:
-                    current_app.logger.info(f"Found duplicate profile by email match: {candidate_name} (Email: {profile_email_id})")
+                    log.info(f"Found duplicate profile by email match: {candidate_name} (Email: {profile_email_id})")
             
             # If no email match found, check by contact
             if not profile and contact_no:
                 profile = Profile.query.filter(Profile.contact_no == contact_no).first()
                 if profile:
-                    current_app.logger.info(f"Found duplicate profile by contact match: {candidate_name} (Contact: {contact_no})")
-
-            def to_float(val):
-                try:
-                    return float(re.sub(r'[^0-9.]', '', str(val))) if val else None
-                except:
-                    return None
-
-            def to_int(val):
-                try:
-                    return int(re.sub(r'[^0-9]', '', str(val))) if val else None
-                except:
-                    return None
-
-            # Prepare new data for comparison - handle both old and new field names
-            new_data = {
-                'total_experience': to_float(profile_data.get('total_experience')),
-                'relevant_experience': to_float(profile_data.get('relevant_experience')),
-                'current_company': profile_data.get('current_company'),
-                'ctc_current': to_float(profile_data.get('ctc_current') or profile_data.get('current_ctc')),
-                'ctc_expected': to_float(profile_data.get('ctc_expected') or profile_data.get('expected_ctc')),
-                'notice_period_days': to_int(profile_data.get('notice_period_days') or profile_data.get('notice_period')),
-                'location': profile_data.get('location') or profile_data.get('current_location'),
-                'education': profile_data.get('education') or profile_data.get('qualification'),
-                'key_skills': profile_data.get('key_skills') or profile_data.get('skills'),
-                'source': profile_data.get('source'),
-                'email_id': profile_email_id if (profile_email_id and '@' in str(profile_email_id)) else None,
-                'contact_no': profile_data.get('contact_no'),
-                'candidate_email': profile_data.get('candidate_email'),
-                'oracle_id': profile_data.get('oracle_id'),
-                'offer_in_hand': profile_data.get('offer_in_hand'),
-                'availability': profile_data.get('availability')
-            }
+                    log.info(f"Found duplicate profile by contact match: {candidate_name} (Contact: {contact_no})")
 
-            from app.database import db
             if not profile:
                 # Generate a short unique student_id
                 student_id = self._generate_student_id()
                 profile = Profile(student_id=student_id, candidate_name=candidate_name, **new_data)
                 db.session.add(profile)
                 db.session.commit()
-                current_app.logger.info(f"Created new profile for {candidate_name}")
+                log.info(f"Created new profile for {candidate_name}")
                 return profile
             else:
-                # Only update if any field has changed, but protect key_skills from being overwritten with empty values
-                updated = False
-                for k, v in new_data.items():
-                    current_value = getattr(profile, k)
-                    
-                    # Special handling for key_skills - only update if data comes from table extraction
-                    if k == 'key_skills':
-                        if from_table and v and v.strip() and (not current_value or current_value.strip() != v.strip()):
-                            current_app.logger.info(f"Updating key_skills for {candidate_name} (from table): '{current_value}' -> '{v}'")
-                            setattr(profile, k, v)
-                            updated = True
-                        elif not from_table and v and v.strip():
-                            current_app.logger.info(f"Skipping key_skills update for {candidate_name} (not from table): '{v}'")
-                        elif v and v.strip() and current_value and current_value.strip() == v.strip():
-                            current_app.logger.info(f"key_skills already match for {candidate_name}: '{v}'")
-                        elif not v or not v.strip():
-                            current_app.logger.info(f"Skipping empty key_skills update for {candidate_name}")
-                    else:
-                        # For other fields, update if different
-                        if current_value != v:
-                            setattr(profile, k, v)
-                            updated = True
-                            
-                if updated:
+                # Only update if any field has changed
+                if self._apply_profile_updates(profile, new_data, candidate_name, from_table):
                     db.session.commit()
-                    current_app.logger.info(f"Updated profile for {candidate_name}")
+                    log.info(f"Updated profile for {candidate_name}")
                 else:
-                    current_app.logger.info(f"No changes for profile {candidate_name}, skipping update.")
+                    log.info(f"No changes for profile {candidate_name}, skipping update.")
                 return profile
         except Exception as e:
-            current_app.logger.error(f"Error creating/updating profile: {str(e)}")
-            from app.database import db
+            log.error(f"Error creating/updating profile: {str(e)}")
             db.session.rollback()
+            # Re-read the highest committed student_id on next use
+            self._next_student_num = None
             return None
 
-    def _save_attachment(self, attachment_data: bytes, filename: str) -> str:
-        """Save attachment to disk and return the file path"""
-        upload_dir = os.path.join(current_app.root_path, 'uploads', 'attachments')
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        safe_filename = f"{timestamp}_{filename}"
-        file_path = os.path.join(upload_dir, safe_filename)
-        
-        with open(file_path, 'wb') as f:
-            f.write(attachment_data)
-        
-        return file_path
+    def _create_or_update_profiles(self, profiles_data: List[Dict[str, Any]], email_id: str, from_table: bool = True) -> List[Profile]:
+        """Create or update many profiles with one duplicate lookup and a single commit
+
+        If the batch commit fails, each profile is saved on its own instead so one
+        bad row does not lose the rest.
+
+        Args:
+            profiles_data: Profile data dicts, e.g. from extract_profiles_from_html
+            email_id: Source email identifier
+            from_table: Whether the data came from table extraction (allows key_skills updates)
+
+        Returns:
+            List of created or updated profiles
+        """
+        log = current_app.logger
+        db_session = db.session
+        prepared = [values for values in map(self._prepare_profile_values, profiles_data) if values]
+        if not prepared:
+            return []
+
+        def contact_key(contact) -> Optional[str]:
+            # contact_no is a numeric column, so only digit strings can match it
+            contact = str(contact) if contact is not None else ''
+            return str(int(contact)) if contact.isdigit() else None
+
+        # Profiles by email and by contact, in the order the per-row queries would find them
+        by_email = {}
+        by_contact = {}
+
+        def index_profile(profile: Profile) -> None:
+            if profile.email_id:
+                by_email.setdefault(profile.email_id, []).append(profile)
+            key = contact_key(profile.contact_no)
+            if key:
+                by_contact.setdefault(key, []).append(profile)
+
+        def unindex_profile(profile: Profile, email: Optional[str], key: Optional[str]) -> None:
+            for index, value in ((by_email, email), (by_contact, key)):
+                matches = index.get(value)
+                if matches and profile in matches:
+                    matches.remove(profile)
+
+        try:
+            # Fetch every existing duplicate candidate in one query
+            emails = {lookup_email for _, lookup_email, _, _ in prepared if lookup_email}
+            contacts = {contact_no for _, _, contact_no, _ in prepared if contact_key(contact_no)}
+            conditions = []
+            if emails:
+                conditions.append(Profile.email_id.in_(emails))
+            if contacts:
+                conditions.append(Profile.contact_no.in_(contacts))
+            if conditions:
+                for existing in Profile.query.filter(or_(*conditions)).all():
+                    index_profile(existing)
+
+            saved = []
+            created = []
+            # Queries made while matching (student ID checks) must not flush
+            # each pending row on its own; everything is written in one flush
+            with db_session.no_autoflush:
+                for candidate_name, lookup_email, contact_no, new_data in prepared:
+                    profile = None
+                    if lookup_email and by_email.get(lookup_email):
+                        profile = by_email[lookup_email][0]
+                        log.info(f"Found duplicate profile by email match: {candidate_name} (Email: {lookup_email})")
+                    key = contact_key(contact_no)
+                    if not profile and key and by_contact.get(key):
+                        profile = by_contact[key][0]
+                        log.info(f"Found duplicate profile by contact match: {candidate_name} (Contact: {contact_no})")
+
+                    if not profile:
+                        profile = Profile(student_id=self._generate_student_id(), candidate_name=candidate_name, **new_data)
+                        created.append(profile)
+                        # Later rows in the same batch must see this profile as a duplicate
+                        index_profile(profile)
+                    else:
+                        old_email, old_key = profile.email_id, contact_key(profile.contact_no)
+                        if self._apply_profile_updates(profile, new_data, candidate_name, from_table):
+                            # Later rows must match the profile on its new email/contact, not the old ones
+                            unindex_profile(profile, old_email, old_key)
+                            index_profile(profile)
+                        else:
+                            log.info(f"No changes for profile {candidate_name}, skipping update.")
+                    saved.append(profile)
+
+            db_session.add_all(created)
+            db_session.commit()
+            log.info(f"Saved {len(saved)} profiles ({len(created)} new) in one batch")
+            return saved
+        except Exception as e:
+            log.warning(f"Batch profile save failed, saving profiles individually: {str(e)}")
+            db_session.rollback()
+            # The batch's student_ids were never committed; re-read the highest one
+            self._next_student_num = None
+            return [profile for profile in (self._create_or_update_profile(data, email_id, from_table) for data in profiles_data) if profile]
+
+    def _save_attachment(self, attachment_data: bytes, filename: str) -> Tuple[str, Future]:
+        """Start saving an attachment to disk
+
+        An attachment whose bytes were already saved (e.g. a resume forwarded
+        several times) reuses the existing file while it is still on disk. New
+        files are written in the background; the caller must wait on the
+        returned future before handing the path out.
+
+        Returns:
+            (file path, future that raises OSError if the write failed)
+        """
+        digest = hashlib.sha256(attachment_data).hexdigest()
+        with _attachment_paths_lock:
+            cached = _attachment_paths.get(digest)
+            if cached:
+                existing_path, write = cached
+                # A write still in flight is fine; a finished one must have left the file on disk
+                if not write.done() or (write.exception() is None and os.path.exists(existing_path)):
+                    _attachment_paths.move_to_end(digest)
+                    return existing_path, write
+                del _attachment_paths[digest]
+            
+            upload_dir = os.path.join(current_app.root_path, 'uploads', 'attachments')
+            os.makedirs(upload_dir, exist_ok=True)
+            
+            # Random prefix so same-named attachments saved concurrently never collide
+            safe_filename = f"{uuid.uuid4().hex[:12]}_{filename}"
+            file_path = os.path.join(upload_dir, safe_filename)
+            write = _attachment_writer.submit(_write_attachment, file_path, attachment_data, digest)
+            _attachment_paths[digest] = (file_path, write)
+            if len(_attachment_paths) > ATTACHMENT_PATH_CACHE_SIZE:
+                _attachment_paths.popitem(last=False)
+        
+        return file_path, write
 
 
 
     def _get_access_token(self) -> Optional[str]:
-        """Get Microsoft Graph API access token"""
+        """Get Microsoft Graph API access token, reusing it until shortly before it expires"""
+        cache_key = (self.client_id, self.authority)
         try:
-            app = msal.ConfidentialClientApplication(
-                self.client_id,
-                authority=self.authority,
-                client_credential=self.client_secret
-            )
-            
-            result = app.acquire_token_silent(self.scope, account=None)
-            if not result:
-                result = app.acquire_token_for_client(scopes=self.scope)
-            
-            if result and "access_token" in result:
-                return result["access_token"]
-            else:
-                error_desc = result.get("error_description", "No error description") if result else "No result"
-                print(f"Error getting token: {error_desc}")
-                return None
+            with _access_token_lock:
+                cached = _access_tokens.get(cache_key)
+                if cached and time.time() < cached[1] - ACCESS_TOKEN_EXPIRY_MARGIN:
+                    return cached[0]
+                
+                app = _get_msal_app(self.client_id, self.authority, self.client_secret)
+                result = app.acquire_token_silent(self.scope, account=None)
+                if not result:
+                    result = app.acquire_token_for_client(scopes=self.scope)
+                
+                if result and "access_token" in result:
+                    expires_at = time.time() + int(result.get("expires_in", 3600))
+                    _access_tokens[cache_key] = (result["access_token"], expires_at)
+                    return result["access_token"]
+                else:
+                    error_desc = result.get("error_description", "No error description") if result else "No result"
+                    print(f"Error getting token: {error_desc}")
+                    return None
         except Exception as e:
             print(f"Error in _get_access_token: {str(e)}")
             return None
@@ -787,13 +1938,13 @@ class EmailProcessor:
             
         try:
             # Convert HTML to text if needed
-            if '<' in text and '>' in text:  # Simple check for HTML content
+            if _HTML_TAG_RE.search(text):
                 text = self.html2text.handle(text)
             
             # Basic text cleaning
             text = text.strip()
-            text = re.sub(r'\s+', ' ', text)  # Replace multiple spaces with single space
-            text = re.sub(r'\n\s*\n', '\n\n', text)  # Replace multiple newlines with double newline
+            text = _WHITESPACE_RE.sub(' ', text)  # Replace multiple spaces with single space
+            text = _BLANK_LINES_RE.sub('\n\n', text)  # Replace multiple newlines with double newline
             
             return text
         except Exception as e:
@@ -807,7 +1958,7 @@ class EmailProcessor:
         
         try:
             # Remove cid: URLs that cause browser errors
-            cleaned_content = re.sub(r'cid:[^\s"\'<>]+', '', content)
+            cleaned_content = _CID_URL_RE.sub('', content)
             return cleaned_content
         except Exception as e:
             current_app.logger.error(f"Error cleaning CID URLs: {str(e)}")
@@ -820,34 +1971,24 @@ class EmailProcessor:
             
         # Convert to string and clean basic formatting
         value = str(value).strip()
-        value = re.sub(r'\s+', ' ', value)  # Normalize whitespace
-        value = value.replace('|', '')  # Remove table separators
-        value = re.sub(r'[\u00A0\u200B\u200C\u200D\uFEFF]', '', value)  # Remove zero-width spaces and nbsp
+        value = _WHITESPACE_RE.sub(' ', value)  # Normalize whitespace
+        value = value.translate(_VALUE_STRIP_TABLE)  # Remove table separators, zero-width spaces and nbsp
         
         # Remove email signatures and disclaimers
-        signature_patterns = [
-            r'(?i)Disclaimer:.*$',
-            r'(?i)This email (?:and|&) any.*$',
-            r'(?i)The information contained.*$',
-            r'(?i)Confidentiality Notice:.*$',
-            r'(?i)www\.[\w\.-]+\.[a-z]{2,}.*$',  # Website URLs
-            r'(?i)(?:T|Tel|M|Mob|E|Email)[\s:]+[\d\w\.-]+@[\w\.-]+\.[a-z]{2,}.*$',  # Contact details
-            r'(?i)(?:T|Tel|M|Mob)[\s:]+(?:\+\d{1,4}[-\s]?)?\d[-\d\s]{8,}.*$',  # Phone numbers
-            r'(?i)(?:regards|thank(?:s|ing) you|best|sincerely|yours truly).*$',  # Email closings
-            r'(?i)(?:floor|building|road|street|lane|area).*(?:pin|zip)?.*\d{6}.*$',  # Addresses
-        ]
-        
-        for pattern in signature_patterns:
-            value = re.sub(pattern, '', value)
+        for pattern in _VALUE_SIGNATURE_RES:
+            signature = pattern.search(value)
+            if signature:
+                value = value[:signature.start()]
             
         # Remove any remaining lines that look like contact info or signatures
         lines = value.split('\n')
         cleaned_lines = []
         for line in lines:
             # Skip lines that look like signatures or contact info
-            if any(x in line.lower() for x in ['@', 'www.', 'http', '.com', '.in', '.org', 'copyright', 'all rights']):
+            line_lower = line.lower()
+            if any(token in line_lower for token in _SIG_TOKENS):
                 continue
-            if re.search(r'^[\w\s\.-]+\s*[|:]\s*[\w\s\.-]+$', line):  # Simple key-value contact info
+            if _KEY_VALUE_LINE_RE.search(line):  # Simple key-value contact info
                 continue
             cleaned_lines.append(line)
         
@@ -855,47 +1996,29 @@ class EmailProcessor:
         
         # Final cleanup
         value = value.strip()
-        value = re.sub(r'\s+', ' ', value)  # Final whitespace normalization
+        value = _WHITESPACE_RE.sub(' ', value)  # Final whitespace normalization
         
         return value
 
     def _clean_html_content(self, html_content: str) -> str:
         """Clean HTML content and extract text while preserving structure"""
         try:
-            # Remove style tags and their contents
-            html_content = re.sub(r'<style[^>]*>.*?</style>', '', html_content, flags=re.DOTALL)
-            
-            # Remove script tags and their contents
-            html_content = re.sub(r'<script[^>]*>.*?</script>', '', html_content, flags=re.DOTALL)
-            
-            # Replace <br> and <div> with newlines
-            html_content = re.sub(r'<br[^>]*>', '\n', html_content)
-            html_content = re.sub(r'</div>\s*<div[^>]*>', '\n', html_content)
-            
-            # Parse with BeautifulSoup - use 'html.parser' as fallback if html5lib fails
-            try:
-                soup = BeautifulSoup(html_content, 'html5lib')
-            except Exception as e:
-                current_app.logger.warning(f"html5lib parser failed, using html.parser: {str(e)}")
-                soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Remove all style attributes
-            for tag in soup.find_all(style=True):
-                del tag['style']
-            
-            # Get text while preserving some structure
-            lines = []
-            for element in soup.stripped_strings:
-                line = element.strip()
-                if line:
-                    lines.append(line)
+            if not _HTML_TAG_RE.search(html_content):
+                # Plain text body, nothing to parse
+                stripped = html_content.strip()
+                lines = [stripped] if stripped else []
+            else:
+                lines = _selectolax_text_lines(html_content)
+                if lines is None:
+                    lines = _lxml_text_lines(html_content)
+            if lines is None:
+                lines = self._soup_text_lines(html_content)
             
             # Join lines with proper spacing
             text = '\n'.join(lines)
             
             # Clean up extra whitespace
-            text = re.sub(r'\n\s*\n', '\n\n', text)  # Remove multiple blank lines
-            text = re.sub(r'[ \t]+', ' ', text)  # Normalize horizontal whitespace
+            text = _TEXT_SPACING_RE.sub(_collapse_spacing, text)  # Remove blank lines, normalize horizontal whitespace
             text = text.strip()
             
             # Decode HTML entities
@@ -907,12 +2030,35 @@ class EmailProcessor:
             current_app.logger.error(f"Error cleaning HTML content: {str(e)}")
             return html_content  # Return original content if cleaning fails
 
+    def _soup_text_lines(self, html_content: str) -> List[str]:
+        """Extract text lines with BeautifulSoup when lxml cannot be used"""
+        # Remove style tags and their contents
+        html_content = _STYLE_BLOCK_RE.sub('', html_content)
+        
+        # Remove script tags and their contents
+        html_content = _SCRIPT_BLOCK_RE.sub('', html_content)
+        
+        # Replace <br> and <div> with newlines
+        html_content = _BR_TAG_RE.sub('\n', html_content)
+        html_content = _DIV_BREAK_RE.sub('\n', html_content)
+        
+        soup = BeautifulSoup(html_content, 'html.parser')
+        
+        # Get text while preserving some structure
+        lines = []
+        for element in soup.stripped_strings:
+            line = element.strip()
+            if line:
+                lines.append(line)
+        return lines
+
     def _extract_job_requirements(self, text: str, email_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Extract job requirements from email text and subject"""
+        log = current_app.logger
         try:
             # Clean the text first
             text = self._clean_html_content(text)
-            current_app.logger.info(f"Cleaned text for requirements extraction: {text[:500]}...")  # Log first 500 chars
+            log.info(f"Cleaned text for requirements extraction: {text[:500]}...")  # Log first 500 chars
             
             requirements: Dict[str, Any] = {
                 'job_title': None,
@@ -936,98 +2082,26 @@ class EmailProcessor:
                 job_title_from_subject = self._extract_job_title_from_subject(email_data['subject'])
                 if job_title_from_subject:
                     requirements['job_title'] = job_title_from_subject
-                    current_app.logger.info(f"Extracted job title from subject: {job_title_from_subject}")
+                    log.info(f"Extracted job title from subject: {job_title_from_subject}")
 
             # Check if this is an RFH format email (check both subject and body)
-            subject = email_data.get('subject', '').lower() if email_data else ''
-            is_rfh_email = (
-                'request for hire' in text.lower() or 
-                'rfh' in text.lower() or
-                'rfh' in subject or
-                'request for hire' in subject or
-                'request for hiring' in subject
-            )
+            subject = (email_data.get('subject') or '') if email_data else ''
+            is_rfh_email = bool(_RFH_DETECT_RE.search(subject) or _RFH_DETECT_RE.search(text))
             
             if is_rfh_email:
-                current_app.logger.info(f"Detected RFH format email, extracting detailed fields")
+                log.info(f"Detected RFH format email, extracting detailed fields")
                 
                 # First, try to extract from HTML list items if present
                 html_extracted = self._extract_from_html_lists(text)
                 if html_extracted:
-                    current_app.logger.info(f"Extracted data from HTML lists: {html_extracted}")
+                    log.info(f"Extracted data from HTML lists: {html_extracted}")
                     for field, value in html_extracted.items():
                         if value and not requirements.get(field):
                             requirements[field] = value
                 
                 # Extract each field using more flexible patterns
-                field_patterns = {
-                    'job_title': [
-                        r'job\s*title\s*:?\s*([^:\n]+?)(?=\s*(?:department|location|experience|$))',
-                        r'position\s*:?\s*([^:\n]+?)(?=\s*(?:department|location|experience|$))',
-                        r'role\s*:?\s*([^:\n]+?)(?=\s*(?:department|location|experience|$))'
-                    ],
-                    'department': [
-                        r'department\s*:?\s*([^:\n]+?)(?=\s*(?:location|shift|$))',
-                        r'dept\s*:?\s*([^:\n]+?)(?=\s*(?:location|shift|$))',
-                        r'division\s*:?\s*([^:\n]+?)(?=\s*(?:location|shift|$))'
-                    ],
-                    'location': [
-                        r'location\s*:?\s*([^:\n]+?)(?=\s*(?:shift|job\s*type|$))',
-                        r'work\s*location\s*:?\s*([^:\n]+?)(?=\s*(?:shift|job\s*type|$))',
-                        r'job\s*location\s*:?\s*([^:\n]+?)(?=\s*(?:shift|job\s*type|$))',
-                        r'place\s*of\s*work\s*:?\s*([^:\n]+?)(?=\s*(?:shift|job\s*type|$))'
-                    ],
-                    'shift': [
-                        r'shift\s*:?\s*([^:\n]+?)(?=\s*(?:job\s*type|hiring|$))',
-                        r'timing\s*:?\s*([^:\n]+?)(?=\s*(?:job\s*type|hiring|$))'
-                    ],
-                    'job_type': [
-                        r'job\s*type\s*:?\s*([^:\n]+?)(?=\s*(?:hiring\s*manager|experience|$))',
-                        r'employment\s*type\s*:?\s*([^:\n]+?)(?=\s*(?:hiring\s*manager|experience|$))'
-                    ],
-                    'hiring_manager': [
-                        r'hiring\s*manager\s*:?\s*([^:\n]+?)(?=\s*(?:justification|experience|$))',
-                        r'manager\s*:?\s*([^:\n]+?)(?=\s*(?:justification|experience|$))'
-                    ],
-                    'experience_range': [
-                        r'experience\s*range\s*:?\s*([^:\n]+?)(?=\s*(?:skills|minimum|$))',
-                        r'experience\s*:?\s*([^:\n]+?)(?=\s*(?:skills|minimum|$))',
-                        r'years\s*of\s*experience\s*:?\s*([^:\n]+?)(?=\s*(?:skills|minimum|$))'
-                    ],
-                    'skills_required': [
-                        r'skills\s*required\s*:?\s*([^:\n]+?)(?=\s*(?:minimum|number|$))',
-                        r'skills\s*:?\s*([^:\n]+?)(?=\s*(?:minimum|number|$))',
-                        r'technical\s*skills\s*:?\s*([^:\n]+?)(?=\s*(?:minimum|number|$))'
-                    ],
-                    'minimum_qualification': [
-                        r'minimum\s*qualification\s*:?\s*([^:\n]+?)(?=\s*(?:preferred|number|budget|$))',
-                        r'qualification\s*:?\s*([^:\n]+?)(?=\s*(?:preferred|number|budget|$))',
-                        r'education\s*:?\s*([^:\n]+?)(?=\s*(?:preferred|number|budget|$))'
-                    ],
-                    'number_of_positions': [
-                        r'number\s*of\s*positions\s*:?\s*(\d+)',
-                        r'positions\s*:?\s*(\d+)',
-                        r'openings\s*:?\s*(\d+)'
-                    ],
-                    'budget_ctc': [
-                        r'budgeted\s*ctc\s*range\s*:?\s*([^:\n]+?)(?=\s*(?:internal|tentative|additional|$))',
-                        r'budget\s*:?\s*([^:\n]+?)(?=\s*(?:internal|tentative|additional|$))',
-                        r'ctc\s*:?\s*([^:\n]+?)(?=\s*(?:internal|tentative|additional|$))',
-                        r'salary\s*:?\s*([^:\n]+?)(?=\s*(?:internal|tentative|additional|$))'
-                    ],
-                    'tentative_doj': [
-                        r'tentative\s*doj\s*:?\s*\[?([^:\]\n]+?)(?:\]|\s*(?:additional|thanks|regards|$))',
-                        r'date\s*of\s*joining\s*:?\s*\[?([^:\]\n]+?)(?:\]|\s*(?:additional|thanks|regards|$))',
-                        r'joining\s*date\s*:?\s*\[?([^:\]\n]+?)(?:\]|\s*(?:additional|thanks|regards|$))'
-                    ],
-                    'additional_remarks': [
-                        r'additional\s*remarks\s*:?\s*\[?([^:\]\n]+?)(?:\]|\s*(?:thanks|regards|$))',
-                        r'remarks\s*:?\s*\[?([^:\]\n]+?)(?:\]|\s*(?:thanks|regards|$))',
-                        r'notes\s*:?\s*\[?([^:\]\n]+?)(?:\]|\s*(?:thanks|regards|$))'
-                    ]
-                }
-
-                for field, patterns in field_patterns.items():
+                text_lower = text.lower()
+                for field, patterns in _RFH_FIELD_PATTERNS.items():
                     # Don't override job title if we already extracted it from subject
                     if field == 'job_title' and requirements['job_title']:
                         continue
@@ -1037,20 +2111,22 @@ class EmailProcessor:
                         continue
                     
                     # Try each pattern for this field
-                    for pattern in patterns:
-                        match = re.search(pattern, text, re.IGNORECASE)
+                    for keyword, pattern in patterns:
+                        if keyword not in text_lower:
+                            continue
+                        match = pattern.search(text)
                         if match:
                             value = match.group(1).strip()
                             # Clean up the value - remove formatting characters
-                            value = re.sub(r'^\s*[\[•\-\*]\s*', '', value)  # Remove leading brackets, bullets, dashes
-                            value = re.sub(r'\s*[\]•\-\*]\s*$', '', value)  # Remove trailing brackets, bullets, dashes
-                            value = re.sub(r'\s+', ' ', value)  # Normalize whitespace
+                            value = _LEADING_BULLET_RE.sub('', value)  # Remove leading brackets, bullets, dashes
+                            value = _TRAILING_BULLET_RE.sub('', value)  # Remove trailing brackets, bullets, dashes
+                            value = _WHITESPACE_RE.sub(' ', value)  # Normalize whitespace
                             value = value.strip(':-,. \t\n')  # Remove common punctuation from edges
                             
                             # Special handling for certain fields
                             if field == 'skills_required' and value:
                                 # Split skills and format as bullet points
-                                skills = [s.strip() for s in re.split(r'[,;&]', value) if s.strip()]
+                                skills = [s.strip() for s in _REQUIRED_SKILLS_SPLIT_RE.split(value) if s.strip()]
                                 if skills:
                                     value = '\n'.join(f'• {skill}' for skill in skills)
                             
@@ -1065,46 +2141,30 @@ class EmailProcessor:
                             
                             elif field == 'budget_ctc' and value:
                                 # Clean up CTC value
-                                value = re.sub(r'(?i)(?:inr|rs\.?|rupees|\(.*?\))', '', value)
+                                value = _CTC_CURRENCY_RE.sub('', value)
                                 value = value.replace('₹', '').strip()
                             
                             requirements[field] = value
-                            current_app.logger.info(f"Extracted {field}: {value}")
+                            log.info(f"Extracted {field}: {value}")
                             break  # Found a match, move to next field
 
             else:
-                current_app.logger.info(f"Not an RFH format email, using fallback extraction methods")
+                log.info(f"Not an RFH format email, using fallback extraction methods")
                 # Fallback to previous extraction methods for non-RFH emails
                 # Only try to extract job title from body if we didn't get it from subject
-                if not requirements['job_title']:
-                    title_patterns = [
-                        r'requirement\s+for\s+["\']?([^"\']+?)["\']?(?=\s|$)',
-                        r'urgent\s+requirement\s+([^,\n]+)',
-                        r'opening\s+for\s+([^,\n]+)',
-                        r'position:\s*([^,\n:]+?)(?=\s*(?:department|location|experience|skills|$))',
-                        r'role:\s*([^,\n:]+?)(?=\s*(?:department|location|experience|skills|$))',
-                        r'job\s+title:\s*([^,\n:]+?)(?=\s*(?:department|location|experience|skills|$))',
-                        r'hiring\s+for\s+([^,\n]+)'
-                    ]
-                    
-                    for pattern in title_patterns:
-                        match = re.search(pattern, text, re.IGNORECASE)
+                if not requirements['job_title'] and _GENERIC_TITLE_ANY_RE.search(text):
+                    for pattern in _GENERIC_TITLE_RES:
+                        match = pattern.search(text)
                         if match:
                             job_title = match.group(1).strip()
                             if job_title and len(job_title) > 3:  # Ensure meaningful title
                                 requirements['job_title'] = job_title
-                                current_app.logger.info(f"Extracted job title from body: {job_title}")
+                                log.info(f"Extracted job title from body: {job_title}")
                                 break
 
                 # Extract other fields using existing patterns
-                location_patterns = [
-                    r'location:\s*([^,\n]+)',
-                    r'place\s+of\s+work:\s*([^,\n]+)',
-                    r'job\s+location:\s*([^,\n]+)',
-                    r'work\s+location:\s*([^,\n]+)'
-                ]
-                for pattern in location_patterns:
-                    match = re.search(pattern, text, re.IGNORECASE)
+                for pattern in _BODY_LOCATION_RES:
+                    match = pattern.search(text)
                     if match:
                         requirements['location'] = match.group(1).strip()
                         break
@@ -1113,198 +2173,22 @@ class EmailProcessor:
             if not requirements.get('job_type'):
                 requirements['job_type'] = 'Full Time'
 
-            current_app.logger.info(f"Extracted requirements: {requirements}")
+            log.info(f"Extracted requirements: {requirements}")
             return requirements
 
         except Exception as e:
-            current_app.logger.error(f"Error extracting requirements: {str(e)}")
+            log.error(f"Error extracting requirements: {str(e)}")
             return {}
 
     def _extract_job_title_from_subject(self, subject: str) -> Optional[str]:
         """Extract job title from email subject using various patterns"""
-        # Remove any Re:, Fwd:, etc. and get the original subject
-        cleaned_subject = re.sub(r'^(?:Re|Fwd|Forward|FW|RE|FWD):\s*', '', subject.strip())
-        
-        current_app.logger.info(f"Extracting job title from subject: '{subject}' -> cleaned: '{cleaned_subject}'")
-        
-        # Handle RFH format with company and location: "RFH: Job Title - Company - Location"
-        # This pattern should match: "RFH: Nokia FlowOne Developer - BOSCH - Bangalore"
-        rfh_company_location_pattern = r'RFH\s*:\s*([^-]+?)\s*-\s*[^-]+\s*-\s*[^-]+$'
-        rfh_match = re.search(rfh_company_location_pattern, cleaned_subject, re.IGNORECASE)
-        if rfh_match:
-            job_title = rfh_match.group(1).strip()
-            # Clean up the job title
-            job_title = re.sub(r'[^\w\s-]', '', job_title).strip()
-            if job_title and len(job_title) > 3:
-                current_app.logger.info(f"Extracted job title (RFH company-location pattern): '{job_title}'")
-                return job_title
-            else:
-                current_app.logger.warning(f"RFH pattern matched but job title invalid: '{job_title}'")
-        else:
-            current_app.logger.debug(f"RFH pattern 1 did not match: '{cleaned_subject}'")
-        
-        # Handle RFH format with space after colon: "RFH : Job Title - Company - Location"
-        # This pattern should match: "RFH : API developer - BOSCH - Bangalore"
-        rfh_space_pattern = r'RFH\s*:\s*([^-]+?)\s*-\s*[^-]+\s*-\s*[^-]+$'
-        rfh_space_match = re.search(rfh_space_pattern, cleaned_subject, re.IGNORECASE)
-        if rfh_space_match:
-            job_title = rfh_space_match.group(1).strip()
-            # Clean up the job title
-            job_title = re.sub(r'[^\w\s-]', '', job_title).strip()
-            if job_title and len(job_title) > 3:
-                current_app.logger.info(f"Extracted job title (RFH space pattern): '{job_title}'")
-                return job_title
-            else:
-                current_app.logger.warning(f"RFH space pattern matched but job title invalid: '{job_title}'")
+        log = current_app.logger
+        job_title, pattern_name = _parse_job_title_from_subject(subject)
+        if job_title:
+            log.info(f"Extracted job title ({pattern_name} pattern) from subject '{subject}': '{job_title}'")
         else:
-            current_app.logger.debug(f"RFH space pattern did not match: '{cleaned_subject}'")
-        
-        # Handle RFH format with just company: "RFH: Job Title - Company"
-        rfh_company_pattern = r'RFH\s*:\s*([^-]+?)\s*-\s*[^-]+$'
-        rfh_match = re.search(rfh_company_pattern, cleaned_subject, re.IGNORECASE)
-        if rfh_match:
-            job_title = rfh_match.group(1).strip()
-            # Clean up the job title
-            job_title = re.sub(r'[^\w\s-]', '', job_title).strip()
-            if job_title and len(job_title) > 3:
-                current_app.logger.info(f"Extracted job title (RFH company pattern): '{job_title}'")
-                return job_title
-            else:
-                current_app.logger.warning(f"RFH company pattern matched but job title invalid: '{job_title}'")
-        else:
-            current_app.logger.debug(f"RFH company pattern did not match: '{cleaned_subject}'")
-        
-        # Handle non-RFH format with company and location: "Job Title - Company - Location"
-        # This pattern should match: "Chatbot Developer - BOSCH - Bangalore"
-        company_location_pattern = r'^([^-]+?)\s*-\s*[^-]+\s*-\s*[^-]+$'
-        company_location_match = re.search(company_location_pattern, cleaned_subject, re.IGNORECASE)
-        if company_location_match:
-            job_title = company_location_match.group(1).strip()
-            # Clean up the job title
-            job_title = re.sub(r'[^\w\s-]', '', job_title).strip()
-            if job_title and len(job_title) > 3:
-                current_app.logger.info(f"Extracted job title (company-location pattern): '{job_title}'")
-                return job_title
-            else:
-                current_app.logger.warning(f"Company-location pattern matched but job title invalid: '{job_title}'")
-        else:
-            current_app.logger.debug(f"Company-location pattern did not match: '{cleaned_subject}'")
-        
-        # Handle non-RFH format with just company: "Job Title - Company"
-        company_pattern = r'^([^-]+?)\s*-\s*[^-]+$'
-        company_match = re.search(company_pattern, cleaned_subject, re.IGNORECASE)
-        if company_match:
-            job_title = company_match.group(1).strip()
-            # Clean up the job title
-            job_title = re.sub(r'[^\w\s-]', '', job_title).strip()
-            if job_title and len(job_title) > 3:
-                current_app.logger.info(f"Extracted job title (company pattern): '{job_title}'")
-                return job_title
-            else:
-                current_app.logger.warning(f"Company pattern matched but job title invalid: '{job_title}'")
-        else:
-            current_app.logger.debug(f"Company pattern did not match: '{cleaned_subject}'")
-        
-        # Handle "Request for Hire (RFH) for Job Title" format
-        # This pattern should match: "Request for Hire (RFH) for Full Stack Developer."
-        rfh_request_pattern = r'Request for Hire\s*\(RFH\)\s+for\s+([^.\n]+)'
-        rfh_request_match = re.search(rfh_request_pattern, cleaned_subject, re.IGNORECASE)
-        if rfh_request_match:
-            job_title = rfh_request_match.group(1).strip()
-            # Clean up the job title
-            job_title = re.sub(r'[^\w\s-]', '', job_title).strip()
-            if job_title and len(job_title) > 3:
-                current_app.logger.info(f"Extracted job title (RFH request pattern): '{job_title}'")
-                return job_title
-            else:
-                current_app.logger.warning(f"RFH request pattern matched but job title invalid: '{job_title}'")
-        else:
-            current_app.logger.debug(f"RFH request pattern did not match: '{cleaned_subject}'")
-        
-        # Handle "Request for hiring for role Job Title" format
-        # This pattern should match: "Request for hiring for role AWS Engineer"
-        hiring_role_pattern = r'Request for hiring for role\s+([^.\n]+)'
-        hiring_role_match = re.search(hiring_role_pattern, cleaned_subject, re.IGNORECASE)
-        if hiring_role_match:
-            job_title = hiring_role_match.group(1).strip()
-            # Clean up the job title
-            job_title = re.sub(r'[^\w\s-]', '', job_title).strip()
-            if job_title and len(job_title) > 3:
-                current_app.logger.info(f"Extracted job title (hiring role pattern): '{job_title}'")
-                return job_title
-            else:
-                current_app.logger.warning(f"Hiring role pattern matched but job title invalid: '{job_title}'")
-        else:
-            current_app.logger.debug(f"Hiring role pattern did not match: '{cleaned_subject}'")
-        
-        # First, try to extract after ":-" (most specific pattern for your case)
-        colon_dash_match = re.search(r'[:-]\s*([^:-]+)$', cleaned_subject)
-        if colon_dash_match:
-            extracted = colon_dash_match.group(1).strip()
-            # If the extracted part looks like a job title (not too long, contains technical terms)
-            if extracted and len(extracted) < 100 and not any(word in extracted.lower() for word in ['resume', 'tracker', 'sheet', 'submission']):
-                # Clean up the extracted title
-                title = re.sub(r'[^\w\s-]', '', extracted).strip()
-                if title:
-                    current_app.logger.info(f"Extracted job title (colon-dash pattern): '{title}'")
-                    return title
-        
-        # Try to extract after "Resume & Tracker sheet"
-        tracker_match = re.search(r'Resume & Tracker sheet[^:]*[:-]\s*([^:-]+)$', cleaned_subject, re.IGNORECASE)
-        if tracker_match:
-            extracted = tracker_match.group(1).strip()
-            if extracted and len(extracted) < 100:
-                title = re.sub(r'[^\w\s-]', '', extracted).strip()
-                if title:
-                    current_app.logger.info(f"Extracted job title (tracker pattern): '{title}'")
-                    return title
-        
-        # Try to extract after "Candidate Submission"
-        submission_match = re.search(r'Candidate Submission[^:]*[:-]\s*([^:-]+)$', cleaned_subject, re.IGNORECASE)
-        if submission_match:
-            extracted = submission_match.group(1).strip()
-            if extracted and len(extracted) < 100:
-                title = re.sub(r'[^\w\s-]', '', extracted).strip()
-                if title:
-                    current_app.logger.info(f"Extracted job title (submission pattern): '{title}'")
-                    return title
-        
-        # Try to extract after "Hiring Manager profile + RFH Req"
-        hiring_manager_pattern = r'Hiring Manager profile \+ RFH Req'
-        if re.search(hiring_manager_pattern, cleaned_subject, re.IGNORECASE):
-            # For this pattern, try to extract from the end of the subject
-            # Remove the pattern and get what's left
-            remaining = re.sub(hiring_manager_pattern, '', cleaned_subject, flags=re.IGNORECASE).strip()
-            if remaining:
-                title = re.sub(r'[^\w\s-]', '', remaining).strip()
-                if title and len(title) > 3:
-                    current_app.logger.info(f"Extracted job title (hiring manager pattern): '{title}'")
-                    return title
-        
-        # Generic patterns for job titles
-        generic_patterns = [
-            r'requirement\s+for\s+["\']?([^"\']+?)["\']?(?=\s|$)',
-            r'urgent\s+requirement\s+([^,\n]+)',
-            r'opening\s+for\s+([^,\n]+)',
-            r'position:\s*([^,\n:]+?)(?=\s*(?:department|location|experience|skills|$))',
-            r'role:\s*([^,\n:]+?)(?=\s*(?:department|location|experience|skills|$))',
-            r'job\s+title:\s*([^,\n:]+?)(?=\s*(?:department|location|experience|skills|$))',
-            r'hiring\s+for\s+([^,\n]+)'
-        ]
-        
-        for pattern in generic_patterns:
-            match = re.search(pattern, cleaned_subject, re.IGNORECASE)
-            if match:
-                job_title = match.group(1).strip()
-                if job_title and len(job_title) > 3:
-                    # Clean up the job title
-                    job_title = re.sub(r'[^\w\s-]', '', job_title).strip()
-                    if job_title:
-                        current_app.logger.info(f"Extracted job title (generic pattern): '{job_title}'")
-                        return job_title
-        
-        current_app.logger.warning(f"No job title pattern matched for subject: '{cleaned_subject}'")
-        return None
+            log.warning(f"No job title pattern matched for subject: '{subject}'")
+        return job_title
 
     def _get_thread_id(self, email_data: Dict[str, Any]) -> str:
         """Extract or generate a thread ID to group related emails"""
@@ -1316,7 +2200,8 @@ class EmailProcessor:
         # If no conversation ID, try to extract from subject
         subject = email_data.get('subject', '')
         # Remove Re:, Fwd:, etc. and clean the subject
-        clean_subject = re.sub(r'^(?:Re|Fwd|Forward|FW|RE|FWD):\s*', '', subject).strip()
+        clean_subject = _REPLY_PREFIX_RE.sub('', subject) if subject.startswith(_REPLY_PREFIXES) else subject
+        clean_subject = clean_subject.strip()
         # Use cleaned subject as thread ID
         return f"thread_{clean_subject}"
 
@@ -1324,8 +2209,9 @@ class EmailProcessor:
         """Extract requirements data from table in email"""
         try:
             current_app.logger.info("Starting table extraction for requirements")
-            soup = BeautifulSoup(html_content, 'html.parser')
-            tables = soup.find_all('table')
+            tables = _lxml_requirement_tables(html_content)
+            if tables is None:
+                tables = _soup_requirement_tables(html_content)
             current_app.logger.info(f"Found {len(tables)} tables in the email")
             
             requirements: Dict[str, Any] = {
@@ -1350,169 +2236,73 @@ class EmailProcessor:
                 return {}
 
             # First try to get job title from the text before the table
-            first_table = tables[0]
-            text_before_table = first_table.find_previous_sibling(string=True)
+            text_before_table = tables[0][1]
             if text_before_table:
                 text = text_before_table.strip()
                 current_app.logger.info(f"Text before table: {text}")
-                job_matches = re.findall(r'(?:for|hiring)\s+(?:a\s+)?([^,\n]+?)(?:\s+along|\s+with|\s*$)', text, re.IGNORECASE)
+                job_matches = _TABLE_INTRO_TITLE_RE.findall(text)
                 if job_matches:
                     requirements['job_title'] = self._clean_value(job_matches[0])
                     current_app.logger.info(f"Found job title from text: {requirements['job_title']}")
 
-            # Map common field variations to our database fields
-            field_mapping = {
-                'position': 'job_title',
-                'role': 'job_title',
-                'designation': 'job_title',
-                'dept': 'department',
-                'team': 'department',
-                'business unit': 'department',
-                'work location': 'location',
-                'city': 'location',
-                'base location': 'location',
-                'timing': 'shift',
-                'work hours': 'shift',
-                'employment type': 'job_type',
-                'contract type': 'job_type',
-                'hiring lead': 'hiring_manager',
-                'manager': 'hiring_manager',
-                'reporting to': 'hiring_manager',
-                'experience': 'experience_range',
-                'exp': 'experience_range',
-                'yoe': 'experience_range',
-                'skills': 'skills_required',
-                'technical skills': 'skills_required',
-                'requirements': 'skills_required',
-                'qualification': 'minimum_qualification',
-                'education': 'minimum_qualification',
-                'degree': 'minimum_qualification',
-                'positions': 'number_of_positions',
-                'headcount': 'number_of_positions',
-                'openings': 'number_of_positions',
-                'budget': 'budget_ctc',
-                'salary': 'budget_ctc',
-                'package': 'budget_ctc',
-                'urgency': 'priority',
-                'importance': 'priority',
-                'joining date': 'tentative_doj',
-                'start date': 'tentative_doj',
-                'doj': 'tentative_doj',
-                'remarks': 'additional_remarks',
-                'comments': 'additional_remarks',
-                'notes': 'additional_remarks'
-            }
+            for table_idx, (rows, _, text_after_table) in enumerate(tables):
+                current_app.logger.info(f"Processing table {table_idx + 1}")
+                if not rows:
+                    current_app.logger.warning(f"No rows found in table {table_idx + 1}")
+                    continue
 
-            # Try pandas table extraction first
-            try:
-                tables_df = pd.read_html(html_content)
-                if tables_df:
-                    # Process each table
-                    for df in tables_df:
-                        # Skip tables that look like candidate profiles
-                        if any(col.lower() in ['name', 'candidate', 'consultant'] for col in df.columns):
-                            continue
-                            
-                        # Try to identify requirement tables
-                        if any(col.lower() in field_mapping for col in df.columns):
-                            # Map columns to our fields
-                            for col in df.columns:
-                                col_lower = str(col).lower()
-                                for pattern, field_name in field_mapping.items():
-                                    if pattern in col_lower:
-                                        # Get the first non-null value
-                                        value = df[col].dropna().iloc[0] if not df[col].dropna().empty else None
-                                        if value is not None:
-                                            value = str(value).strip()
-                                            if field_name == 'number_of_positions':
-                                                try:
-                                                    value = int(re.search(r'\d+', str(value)).group())
-                                                except (ValueError, AttributeError):
-                                                    continue
-                                            elif field_name == 'tentative_doj':
-                                                try:
-                                                    for fmt in ['%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y']:
-                                                        try:
-                                                            value = datetime.strptime(value, fmt).date()
-                                                            break
-                                                        except ValueError:
-                                                            continue
-                                                except Exception:
-                                                    continue
-                                            requirements[field_name] = value
-                                        break
-            except Exception as e:
-                current_app.logger.warning(f"Pandas table extraction failed: {str(e)}")
-
-            # Fallback to BeautifulSoup if pandas didn't find anything
-            if not any(requirements.values()):
-                for table_idx, table in enumerate(tables):
-                    current_app.logger.info(f"Processing table {table_idx + 1}")
-                    rows = table.find_all('tr')
-                    if not rows:
-                        current_app.logger.warning(f"No rows found in table {table_idx + 1}")
-                        continue
+                # Get headers
+                raw_headers = [header.lower() for header in rows[0]]
+                # Skip tables that look like candidate profiles
+                if not _CANDIDATE_TABLE_HEADERS.isdisjoint(raw_headers):
+                    continue
+                # Map header to our field name
+                headers = [_requirement_header_field(header) or header for header in raw_headers]
+                current_app.logger.info(f"Table headers: {headers}")
+
+                # Process first data row only (we want requirements, not candidate data)
+                if len(rows) > 1:
+                    cells = rows[1]
+                    current_app.logger.info(f"Processing data row with {len(cells)} cells")
+
+                    for header, cell in zip(headers, cells):
+                        if header in requirements:
+                            value = self._clean_value(cell)
+                            if value:
+                                # Handle special fields
+                                if header == 'number_of_positions':
+                                    match = _DIGITS_RE.search(value)
+                                    if not match:
+                                        continue
+                                    value = int(match.group())
+                                elif header == 'tentative_doj':
+                                    value = self._parse_date_value(value)
+                                    if value is None:
+                                        continue
+
+                                # Store the full value without truncation
+                                requirements[header] = value
+                                current_app.logger.info(f"Found {header}: {requirements[header]}")
+
+                # Look for budget/CTC information in the text after the table
+                if text_after_table:
+                    text = text_after_table.strip()
+                    current_app.logger.info(f"Text after table: {text}")
+                    ctc_matches = _TABLE_BUDGET_RE.findall(text)
+                    if ctc_matches:
+                        value = self._clean_value(ctc_matches[0])
+                        requirements['budget_ctc'] = value
+                        current_app.logger.info(f"Found budget/CTC: {requirements['budget_ctc']}")
+
+            # Set some default values
+            if not requirements.get('job_type'):
+                requirements['job_type'] = 'Full Time'
 
-                    # Get headers
-                    headers = []
-                    header_row = rows[0]
-                    for th in header_row.find_all(['th', 'td']):
-                        header = th.get_text(strip=True).lower()
-                        # Map header to our field name
-                        for pattern, field_name in field_mapping.items():
-                            if pattern in header:
-                                header = field_name
-                                break
-                        headers.append(header)
-                    current_app.logger.info(f"Table headers: {headers}")
-
-                    # Process first data row only (we want requirements, not candidate data)
-                    if len(rows) > 1:
-                        data_row = rows[1]
-                        cells = data_row.find_all(['td', 'th'])
-                        current_app.logger.info(f"Processing data row with {len(cells)} cells")
-
-                        for header, cell in zip(headers, cells):
-                            if header in requirements:
-                                value = self._clean_value(cell.get_text(strip=True))
-                                if value:
-                                    # Handle special fields
-                                    if header == 'number_of_positions':
-                                        try:
-                                            match = re.search(r'\d+', value)
-                                            if match:
-                                                value = int(match.group())
-                                        except (ValueError, TypeError):
-                                            continue
-                                    elif header == 'tentative_doj':
-                                        value = self._parse_date_value(value)
-                                        if value is None:
-                                            continue
-                                        
-                                        # Store the full value without truncation
-                                        requirements[header] = value
-                                    current_app.logger.info(f"Found {header}: {requirements[header]}")
-
-                    # Look for budget/CTC information in the text after the table
-                    text_after_table = table.find_next_sibling(string=True)
-                    if text_after_table:
-                        text = text_after_table.strip()
-                        current_app.logger.info(f"Text after table: {text}")
-                        ctc_matches = re.findall(r'(?:budget|ctc|package)[\s:]+([^\n.]+)', text, re.IGNORECASE)
-                        if ctc_matches:
-                            value = self._clean_value(ctc_matches[0])
-                            requirements['budget_ctc'] = value
-                            current_app.logger.info(f"Found budget/CTC: {requirements['budget_ctc']}")
-
-                # Set some default values
-                if not requirements.get('job_type'):
-                    requirements['job_type'] = 'Full Time'
-
-                # Remove None values
-                final_requirements = {k: v for k, v in requirements.items() if v is not None}
-
-                current_app.logger.info(f"Final extracted requirements: {final_requirements}")
-                return final_requirements
+            # Remove None values
+            final_requirements = {k: v for k, v in requirements.items() if v is not None}
+
+            current_app.logger.info(f"Final extracted requirements: {final_requirements}")
+            return final_requirements
 
         except Exception as e:
             current_app.logger.error(f"Error extracting requirements from table: {str(e)}")
@@ -1581,39 +2371,103 @@ class EmailProcessor:
         """Clean email subject by removing Re:, Fw:, Fwd: prefixes and other unwanted text"""
         if not subject:
             return ''
-            
-        subject = str(subject).strip()
-        
-        # Remove reply/forward prefixes (case insensitive)
-        prefixes_to_remove = [
-            r'^re:\s*',
-            r'^fw:\s*', 
-            r'^fwd:\s*',
-            r'^forward:\s*',
-            r'^reply:\s*'
-        ]
-        
-        for prefix in prefixes_to_remove:
-            subject = re.sub(prefix, '', subject, flags=re.IGNORECASE).strip()
-        
-        # Remove extra whitespace
-        subject = re.sub(r'\s+', ' ', subject).strip()
-        
-        return subject
+        return _clean_email_subject_text(str(subject))
+
+    def _load_existing_titles(self) -> Dict[str, str]:
+        """Map each normalized existing requirement job title to its original text"""
+        # Only the distinct titles are needed, not whole requirement rows
+        existing_titles: Dict[str, str] = {}
+        for (existing_title,) in Requirement.query.with_entities(Requirement.job_title).filter(
+            Requirement.job_title.isnot(None)
+        ).distinct():
+            normalized_existing_title = self._normalize_job_title(existing_title)
+            if normalized_existing_title:
+                existing_titles.setdefault(normalized_existing_title, existing_title)
+        return existing_titles
+
+    def _iter_existing_titles(self):
+        """Stream (normalized, original) existing job titles, most recently used first.
+
+        Rows are fetched in batches, so a caller that stops at the first match
+        never loads the whole title list.
+        """
+        query = Requirement.query.with_entities(Requirement.job_title).filter(
+            Requirement.job_title.isnot(None)
+        ).group_by(Requirement.job_title).order_by(func.max(Requirement.created_at).desc())
+        for (existing_title,) in query.yield_per(EXISTING_TITLE_BATCH_SIZE):
+            normalized_existing_title = self._normalize_job_title(existing_title)
+            if normalized_existing_title:
+                yield normalized_existing_title, existing_title
+
+    def _load_duplicate_cache(self, emails: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Load what _is_duplicate_requirement needs for a whole batch of emails at once.
+
+        Args:
+            emails: Emails about to be checked for duplicate requirements
+
+        Returns:
+            Lookup dict for _is_duplicate_requirement, or None if loading failed
+        """
+        try:
+            email_ids = {e.get('id') for e in emails if isinstance(e.get('id'), str) and e.get('id')}
+            senders = {e.get('sender') for e in emails if isinstance(e.get('sender'), str) and e.get('sender')}
+            thread_ids = {self._get_thread_id(e) for e in emails}
+
+            cache: Dict[str, Any] = {
+                'email_ids': set(),
+                'thread_ids': set(),
+                'subjects_by_sender': {},
+                'titles': _TitleSimilarityIndex(self._load_existing_titles()),
+            }
+            rows = Requirement.query.with_entities(
+                Requirement.email_id,
+                Requirement.thread_id,
+                Requirement.sender_email,
+                Requirement.email_subject
+            ).filter(or_(
+                Requirement.email_id.in_(email_ids),
+                Requirement.thread_id.in_(thread_ids),
+                Requirement.sender_email.in_(senders)
+            )).all()
+            for email_id, thread_id, sender_email, email_subject in rows:
+                self._remember_duplicate_keys(cache, email_id, thread_id, sender_email, email_subject)
+            return cache
+        except Exception as e:
+            current_app.logger.warning(f"Could not preload duplicate requirement data: {str(e)}")
+            return None
 
-    def _is_duplicate_requirement(self, email_data: Dict[str, Any]) -> bool:
-        """Check if a requirement already exists for this email to avoid duplicates"""
+    def _remember_duplicate_keys(self, cache: Dict[str, Any], email_id: Optional[str], thread_id: Optional[str],
+                                 sender_email: Optional[str], email_subject: Optional[str],
+                                 job_title: Optional[str] = None) -> None:
+        """Record one requirement's identifying fields in a duplicate-check cache"""
+        if email_id:
+            cache['email_ids'].add(email_id)
+        if thread_id:
+            cache['thread_ids'].add(thread_id)
+        if email_subject:
+            cache['subjects_by_sender'].setdefault(sender_email, []).append(email_subject)
+        cache['titles'].add(self._normalize_job_title(job_title), job_title)
+
+    def _is_duplicate_requirement(self, email_data: Dict[str, Any], cache: Optional[Dict[str, Any]] = None) -> bool:
+        """Check if a requirement already exists for this email to avoid duplicates
+
+        Args:
+            email_data: Email to check
+            cache: Optional batch lookup from _load_duplicate_cache, which replaces
+                the per-email database queries
+        """
         try:
-            from app.models.requirement import Requirement
-            
             email_id = email_data.get('id', '')
             subject = email_data.get('subject', '')
             
             # If we have an email ID, check for exact match first
             if email_id:
-                existing_by_email_id = Requirement.query.filter(
-                    Requirement.email_id == email_id
-                ).first()
+                if cache is not None:
+                    existing_by_email_id = email_id in cache['email_ids']
+                else:
+                    existing_by_email_id = Requirement.query.filter(
+                        Requirement.email_id == email_id
+                    ).first()
                 
                 if existing_by_email_id:
                     current_app.logger.info(f"Found duplicate requirement by email_id: {email_id}")
@@ -1637,32 +2491,45 @@ class EmailProcessor:
             
             # Check if we already have a requirement with the same thread_id
             if thread_id and thread_id != f"thread_{cleaned_subject}":
-                existing_by_thread = Requirement.query.filter(
-                    Requirement.thread_id == thread_id
-                ).first()
+                if cache is not None:
+                    existing_by_thread = thread_id in cache['thread_ids']
+                else:
+                    existing_by_thread = Requirement.query.filter(
+                        Requirement.thread_id == thread_id
+                    ).first()
                 
                 if existing_by_thread:
                     current_app.logger.info(f"Found duplicate requirement by thread_id: {thread_id}")
                     return True
             
             # Third check: exact subject match from same sender (only exact matches)
-            similar_requirements = Requirement.query.filter(
-                Requirement.sender_email == sender,
-                Requirement.email_subject.isnot(None)
-            ).all()
+            if cache is not None:
+                sender_subjects = cache['subjects_by_sender'].get(sender, ())
+            else:
+                sender_subjects = [
+                    email_subject for (email_subject,) in Requirement.query.with_entities(Requirement.email_subject).filter(
+                        Requirement.sender_email == sender,
+                        Requirement.email_subject.isnot(None)
+                    )
+                ]
             
-            for req in similar_requirements:
-                if req.email_subject:
+            # The incoming subject is lowercased and tokenized once for all comparisons
+            current_subject_lower = cleaned_subject.lower()
+            current_subject_key = current_subject_lower.strip()
+            current_subject_tokens = _similarity_tokens(current_subject_lower)
+            for existing_subject in sender_subjects:
+                if existing_subject:
                     # Clean the existing requirement's subject for comparison
-                    existing_cleaned_subject = self._clean_email_subject(req.email_subject)
+                    existing_cleaned_subject = self._clean_email_subject(existing_subject)
+                    existing_subject_lower = existing_cleaned_subject.lower()
                     
                     # Check for exact subject match after cleaning
-                    if existing_cleaned_subject.lower().strip() == cleaned_subject.lower().strip():
+                    if existing_subject_lower.strip() == current_subject_key:
                         current_app.logger.info(f"Found duplicate requirement by exact subject match from same sender: '{existing_cleaned_subject}' vs '{cleaned_subject}'")
                         return True
                     
                     # Only check for very high similarity (95% or more) from same sender to avoid false positives
-                    similarity = self._calculate_subject_similarity(existing_cleaned_subject.lower(), cleaned_subject.lower())
+                    similarity = _token_similarity(current_subject_tokens, _similarity_tokens(existing_subject_lower))
                     if similarity > 0.95:
                         current_app.logger.info(f"Found very similar requirement from same sender: '{existing_cleaned_subject}' vs '{cleaned_subject}' (similarity: {similarity:.2f})")
                         return True
@@ -1675,36 +2542,52 @@ class EmailProcessor:
                 normalized_current_title = self._normalize_job_title(current_job_title)
                 
                 if normalized_current_title:
-                    # Check all existing requirements for job title duplicates (across all senders)
-                    existing_requirements = Requirement.query.filter(
-                        Requirement.job_title.isnot(None)
-                    ).all()
+                    if cache is not None:
+                        existing_titles = cache['titles'].titles
+                        # Check if normalized titles match (EXACT MATCH)
+                        if normalized_current_title in existing_titles:
+                            current_app.logger.info(f"Found duplicate requirement by job title match: '{current_job_title}' vs '{existing_titles[normalized_current_title]}' (normalized: '{normalized_current_title}')")
+                            return True
+                        # Score against every cached title at once
+                        similar = cache['titles'].find_similar(normalized_current_title)
+                        if similar:
+                            normalized_existing_title, title_similarity, common_words = similar
+                            current_app.logger.info(f"Found similar job title: '{current_job_title}' vs '{existing_titles[normalized_existing_title]}' (similarity: {title_similarity:.2f}, common words: {common_words})")
+                            return True
+                        candidate_titles = ()
+                    else:
+                        candidate_titles = self._iter_existing_titles()
                     
-                    for req in existing_requirements:
-                        if req.job_title:
-                            # Normalize existing job title
-                            normalized_existing_title = self._normalize_job_title(req.job_title)
-                            
-                            # Check if normalized titles match (EXACT MATCH)
-                            if normalized_existing_title:
-                                if normalized_current_title.lower().strip() == normalized_existing_title.lower().strip():
-                                    current_app.logger.info(f"Found duplicate requirement by job title match: '{current_job_title}' vs '{req.job_title}' (normalized: '{normalized_current_title}')")
-                                    return True
-                                
-                                # Check for high similarity in job titles (MORE AGGRESSIVE)
-                                title_similarity = self._calculate_subject_similarity(normalized_current_title.lower(), normalized_existing_title.lower())
-                                if title_similarity > 0.85:  # Lowered threshold for more aggressive detection
-                                    current_app.logger.info(f"Found very similar job title: '{current_job_title}' vs '{req.job_title}' (similarity: {title_similarity:.2f})")
-                                    return True
-                                
-                                # Additional check: if both titles contain the same key words
-                                current_words = set(normalized_current_title.lower().split())
-                                existing_words = set(normalized_existing_title.lower().split())
-                                if len(current_words) >= 2 and len(existing_words) >= 2:
-                                    common_words = current_words.intersection(existing_words)
-                                    if len(common_words) >= min(len(current_words), len(existing_words)) * 0.8:  # 80% word overlap
-                                        current_app.logger.info(f"Found duplicate by word overlap: '{current_job_title}' vs '{req.job_title}' (common words: {common_words})")
-                                        return True
+                    # The incoming title is tokenized once; existing titles hit the token cache
+                    current_tokens = _similarity_tokens(normalized_current_title)
+                    current_words = set(normalized_current_title.split())
+                    for normalized_existing_title, existing_title in candidate_titles:
+                        # Check if normalized titles match (EXACT MATCH)
+                        if normalized_existing_title == normalized_current_title:
+                            current_app.logger.info(f"Found duplicate requirement by job title match: '{current_job_title}' vs '{existing_title}' (normalized: '{normalized_current_title}')")
+                            return True
+                        
+                        existing_words = set(normalized_existing_title.split())
+                        # Titles sharing no word can pass neither check below
+                        if current_words.isdisjoint(existing_words):
+                            continue
+                        
+                        # Check for high similarity in job titles (MORE AGGRESSIVE)
+                        # Jaccard similarity is at most the smaller token count over the
+                        # larger one, so only compute it when the sizes are close enough
+                        existing_tokens = _similarity_tokens(normalized_existing_title)
+                        if min(len(current_tokens), len(existing_tokens)) > 0.85 * max(len(current_tokens), len(existing_tokens)):
+                            title_similarity = _token_similarity(current_tokens, existing_tokens)
+                            if title_similarity > 0.85:  # Lowered threshold for more aggressive detection
+                                current_app.logger.info(f"Found very similar job title: '{current_job_title}' vs '{existing_title}' (similarity: {title_similarity:.2f})")
+                                return True
+                        
+                        # Additional check: if both titles contain the same key words
+                        if len(current_words) >= 2 and len(existing_words) >= 2:
+                            common_words = current_words.intersection(existing_words)
+                            if len(common_words) >= min(len(current_words), len(existing_words)) * 0.8:  # 80% word overlap
+                                current_app.logger.info(f"Found duplicate by word overlap: '{current_job_title}' vs '{existing_title}' (common words: {common_words})")
+                                return True
             
             # No duplicate found
             return False
@@ -1716,64 +2599,12 @@ class EmailProcessor:
     
     def _normalize_job_title(self, job_title: str) -> str:
         """Normalize job title for better duplicate detection"""
-        if not job_title:
-            return ''
-        
-        # Convert to lowercase and strip
-        normalized = job_title.lower().strip()
-        
-        # Remove common prefixes/suffixes and noise
-        normalized = re.sub(r'^\[?\s*', '', normalized)  # Remove leading [ and spaces
-        normalized = re.sub(r'\s*\]?$', '', normalized)  # Remove trailing ] and spaces
-        normalized = re.sub(r'[^\w\s]', '', normalized)  # Remove special characters
-        normalized = re.sub(r'\s+', ' ', normalized)     # Normalize whitespace
-        
-        # Remove RFH prefixes and variations
-        rfh_prefixes = [
-            r'^rfh\s*:?\s*',
-            r'^request\s+for\s+hiring?\s*:?\s*',
-            r'^request\s+for\s+hire\s*:?\s*',
-            r'^hiring\s+request\s*:?\s*',
-            r'^requirement\s+for\s+',
-            r'^urgent\s+requirement\s*:?\s*'
-        ]
-        
-        for prefix in rfh_prefixes:
-            normalized = re.sub(prefix, '', normalized, flags=re.IGNORECASE)
-        
-        # Remove common noise words
-        noise_words = [
-            'position', 'role', 'job', 'opening', 'vacancy', 'requirement', 
-            'hiring', 'urgent', 'developer', 'engineer', 'specialist',
-            'for', 'the', 'a', 'an', 'and', 'or', 'with', 'in', 'at'
-        ]
-        
-        for word in noise_words:
-            normalized = re.sub(rf'\b{word}\b', '', normalized, flags=re.IGNORECASE)
-        
-        # Clean up again after removing words
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
-        
-        return normalized
+        return _normalize_job_title_text(job_title) if job_title else ''
 
     def _calculate_subject_similarity(self, subject1: str, subject2: str) -> float:
         """Calculate similarity between two subjects using simple word overlap"""
         try:
-            # Remove common words and split into sets
-            common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should'}
-            
-            words1 = set(word.lower().strip() for word in subject1.split() if word.lower().strip() not in common_words and len(word) > 2)
-            words2 = set(word.lower().strip() for word in subject2.split() if word.lower().strip() not in common_words and len(word) > 2)
-            
-            if not words1 or not words2:
-                return 0.0
-            
-            # Calculate Jaccard similarity (intersection over union)
-            intersection = len(words1.intersection(words2))
-            union = len(words1.union(words2))
-            
-            return intersection / union if union > 0 else 0.0
-            
+            return _token_similarity(_similarity_tokens(subject1), _similarity_tokens(subject2))
         except Exception:
             return 0.0
 
@@ -1795,10 +2626,9 @@ class EmailProcessor:
                 # Try to parse email from string
                 if '<' in sender_info and '>' in sender_info:
                     # Format: "Name <email@domain.com>"
-                    match = re.search(r'"?([^"<]*)"?\s*<([^>]+)>', sender_info)
-                    if match:
-                        sender_name = match.group(1).strip()
-                        sender_email = match.group(2).strip()
+                    parsed_sender = _parse_sender_address(sender_info)
+                    if parsed_sender:
+                        sender_name, sender_email = parsed_sender
                 else:
                     sender_email = sender_info
             
@@ -1943,7 +2773,7 @@ class EmailProcessor:
                 print(f"Error fetching emails: {response.status_code} - {response.text}")
                 return []
             
-            data = response.json()
+            data = _graph_json(response)
             emails = data.get('value', [])
             print(f"Found {len(emails)} emails in the date range")
             current_app.logger.info(f"Fetched {len(emails)} emails from Microsoft Graph API (days parameter: {days})")
@@ -1971,20 +2801,31 @@ class EmailProcessor:
 
                     # Process attachments
                     attachments = []
+                    attachment_writes = []
                     for attachment in email.get('attachments', []):
                         if attachment.get('contentType', '').lower() in ['application/pdf', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']:
                             attachment_data = base64.b64decode(attachment.get('contentBytes', ''))
-                            file_path = self._save_attachment(attachment_data, attachment.get('name', ''))
-                            if file_path:
-                                attachments.append({
-                                    'filename': attachment.get('name', ''),
-                                    'contentType': attachment.get('contentType', ''),
-                                    'size': attachment.get('size', 0),
-                                    'path': file_path
-                                })
+                            file_path, write = self._save_attachment(attachment_data, attachment.get('name', ''))
+                            attachment_writes.append(({
+                                'filename': attachment.get('name', ''),
+                                'contentType': attachment.get('contentType', ''),
+                                'size': attachment.get('size', 0),
+                                'path': file_path
+                            }, write))
 
                     # Clean CID URLs from body content
                     cleaned_body_content = self._clean_cid_urls(body_content)
+                    clean_body = self._clean_text(cleaned_body_content) if content_type.lower() == 'html' else cleaned_body_content
+
+                    # Attachments are written while the body is cleaned; only files
+                    # that actually reached the disk are handed out
+                    for attachment_info, write in attachment_writes:
+                        try:
+                            write.result()
+                        except OSError as e:
+                            current_app.logger.error(f"Error writing attachment {attachment_info['path']}: {str(e)}")
+                            continue
+                        attachments.append(attachment_info)
 
                     # Create processed email
                     processed_email = {
@@ -1994,7 +2835,7 @@ class EmailProcessor:
                         'receivedDateTime': email.get('receivedDateTime', ''),
                         'body': cleaned_body_content,
                         'body_content_type': content_type,
-                        'clean_body': self._clean_text(cleaned_body_content) if content_type.lower() == 'html' else cleaned_body_content,
+                        'clean_body': clean_body,
                         'full_body': cleaned_body_content,
                         'body_preview': email.get('bodyPreview', ''),
                         'attachments': attachments
@@ -2546,13 +3387,22 @@ class EmailProcessor:
             emails = self.fetch_emails(days)
             current_app.logger.info(f"Processing {len(emails)} emails")
             
+            # One round of queries answers the duplicate checks for the whole batch
+            duplicate_cache = self._load_duplicate_cache(emails)
+            
             for email_data in emails:
                 try:
                     requirement_data = self._extract_job_requirements(email_data.get('body', ''), email_data)
                     is_rfh = self._is_rfh_email(email_data)
                     if requirement_data and self._is_valid_requirement(requirement_data, is_rfh_email=is_rfh):
-                        if not self._is_duplicate_requirement(email_data):
-                            self._create_requirement(requirement_data, email_data)
+                        if not self._is_duplicate_requirement(email_data, duplicate_cache):
+                            requirement = self._create_requirement(requirement_data, email_data)
+                            if requirement and duplicate_cache is not None:
+                                # Later emails in this batch must see the new requirement too
+                                self._remember_duplicate_keys(
+                                    duplicate_cache, requirement.email_id, requirement.thread_id,
+                                    requirement.sender_email, requirement.email_subject, requirement.job_title
+                                )
                         else:
                             current_app.logger.info(f"Skipping duplicate requirement for email {email_data.get('subject')}")
                     else:
@@ -2670,21 +3520,9 @@ class EmailProcessor:
             return None
             
         # Try common date formats
-        date_formats = [
-            '%Y-%m-%d',
-            '%d-%m-%Y', 
-            '%d/%m/%Y',
-            '%m/%d/%Y',
-            '%d-%m-%y',
-            '%d/%m/%y',
-            '%Y/%m/%d'
-        ]
-        
-        for fmt in date_formats:
-            try:
-                return datetime.strptime(value, fmt).date()
-            except ValueError:
-                continue
+        parsed_date = _parse_numeric_date(value)
+        if parsed_date:
+            return parsed_date
                 
         # Try to extract date from text like "15th July 2025"
         try:
@@ -2963,7 +3801,7 @@ class EmailProcessor:
                     current_app.logger.error(f"Error fetching emails: {response.text}")
                     break
                 
-                data = response.json()
+                data = _graph_json(response)
                 emails = data.get('value', [])
                 all_emails.extend(emails)
                 
@@ -3037,7 +3875,7 @@ class EmailProcessor:
             response = requests.post(endpoint, headers=headers, json=meeting_data)
             
             if response.status_code == 201:
-                meeting_info = response.json()
+                meeting_info = _graph_json(response)
                 
                 # Extract Teams meeting link
                 teams_meeting_link = meeting_info.get('onlineMeeting', {}).get('joinUrl')
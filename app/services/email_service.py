@@ -9,7 +9,6 @@ from bs4 import BeautifulSoup
 import html2text
 import pandas as pd
 from io import StringIO
-import chardet
 import html
 from email import policy
 from email.parser import Parser
@@ -89,11 +88,6 @@ class EmailService:
     def _clean_text(self, text: str) -> str:
         """Clean and normalize HTML text while preserving structure"""
         try:
-            # First try to detect the encoding
-            encoding_result = chardet.detect(text.encode())
-            if encoding_result['encoding']:
-                text = text.encode().decode(encoding_result['encoding'])
-            
             # Initialize html2text
             h = html2text.HTML2Text()
             h.ignore_links = False
@@ -263,7 +263,7 @@ class NotificationService:
                 )
                 
                 if email_sent:
-                    current_app.logger.info(f"Both notification and email sent successfully for assignment {request_id} to {recruiter_username}")
+                    current_app.logger.info(f"Notification created and email queued for assignment {request_id} to {recruiter_username}")
                 else:
                     current_app.logger.warning(f"Notification created but email failed for assignment {request_id} to {recruiter_username}")
                     
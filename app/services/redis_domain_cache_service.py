@@ -1,6 +1,8 @@
 import logging
 import time
-from typing import Dict, Optional, Any
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional, Any
 from app.services.redis_service import redis_cache_service, redis_service
 from app.services.domain_cache_service import DomainCacheService
 
@@ -9,9 +11,15 @@ logger = logging.getLogger(__name__)
 class RedisDomainCacheService:
     """Enhanced domain cache service with Redis backend and in-memory fallback"""
     
+    # Small per-process LRU in front of Redis so hot domains skip the network round-trip
+    LOCAL_CACHE_SIZE = 32
+    LOCAL_CACHE_TTL = 60
+    
     def __init__(self):
         self.fallback_cache = DomainCacheService()
         self.redis_available = redis_service.is_available()
+        self._local_cache: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._local_lock = Lock()
         
         # Note: During initial import, redis_service might not be initialized yet
         # The reinitialize_redis_connection() method will be called after redis_service.init_app()
@@ -28,6 +36,28 @@ class RedisDomainCacheService:
         else:
             logger.warning("Redis still not available, continuing with in-memory cache")
     
+    def _local_get(self, domain: str) -> Optional[Dict[str, str]]:
+        """Get credentials from the per-process LRU if present and not expired"""
+        with self._local_lock:
+            entry = self._local_cache.get(domain)
+            if entry is None:
+                return None
+            credentials, expires_at = entry
+            if time.monotonic() > expires_at:
+                del self._local_cache[domain]
+                return None
+            self._local_cache.move_to_end(domain)
+            return credentials
+    
+    def _local_set(self, domain: str, credentials: Dict[str, str], ttl: Optional[int] = None) -> None:
+        """Store credentials in the per-process LRU, evicting the least recently used entry"""
+        local_ttl = min(ttl, self.LOCAL_CACHE_TTL) if ttl else self.LOCAL_CACHE_TTL
+        with self._local_lock:
+            self._local_cache[domain] = (credentials, time.monotonic() + local_ttl)
+            self._local_cache.move_to_end(domain)
+            while len(self._local_cache) > self.LOCAL_CACHE_SIZE:
+                self._local_cache.popitem(last=False)
+    
     def get_credentials(self, domain: str) -> Optional[Dict[str, str]]:
         """
         Get cached credentials for a domain (Redis first, fallback to in-memory)
@@ -38,12 +68,18 @@ class RedisDomainCacheService:
         Returns:
             PostgreSQL credentials or None if not cached/expired
         """
-        # Try Redis first if available
+        # Per-process LRU first
+        credentials = self._local_get(domain)
+        if credentials:
+            return credentials
+        
+        # Try Redis next if available
         if self.redis_available:
             try:
                 credentials = redis_cache_service.get_domain_credentials(domain)
                 if credentials:
                     logger.debug(f"Redis cache hit for domain: {domain}")
+                    self._local_set(domain, credentials)
                     return credentials
             except Exception as e:
                 logger.error(f"Error getting credentials from Redis for domain {domain}: {str(e)}")
@@ -66,6 +102,36 @@ class RedisDomainCacheService:
         
         return credentials
     
+    def get_credentials_bulk(self, domains: List[str]) -> Dict[str, Optional[Dict[str, str]]]:
+        """
+        Get cached credentials for several domains using a single Redis round-trip
+        
+        Args:
+            domains: Domain identifiers
+            
+        Returns:
+            Dictionary mapping each domain to its credentials, or None if not cached
+        """
+        results = {domain: self._local_get(domain) for domain in domains}
+        missing = [domain for domain, credentials in results.items() if not credentials]
+        
+        if missing and self.redis_available:
+            try:
+                for domain, credentials in redis_cache_service.get_domain_credentials_bulk(missing).items():
+                    if credentials:
+                        self._local_set(domain, credentials)
+                        results[domain] = credentials
+            except Exception as e:
+                logger.error(f"Error getting bulk credentials from Redis: {str(e)}")
+                self.redis_available = False
+        
+        # Fallback to in-memory cache for anything still missing
+        for domain, credentials in results.items():
+            if not credentials:
+                results[domain] = self.fallback_cache.get_credentials(domain)
+        
+        return results
+    
     def cache_credentials(self, domain: str, credentials: Dict[str, str], ttl: Optional[int] = None) -> None:
         """
         Cache credentials for a domain (Redis first, fallback to in-memory)
@@ -77,6 +143,7 @@ class RedisDomainCacheService:
         """
         # Cache in both Redis and in-memory for redundancy
         success = False
+        self._local_set(domain, credentials, ttl)
         
         # Try Redis first if available
         if self.redis_available:
@@ -112,6 +179,9 @@ class RedisDomainCacheService:
         redis_success = False
         memory_success = False
         
+        with self._local_lock:
+            self._local_cache.pop(domain, None)
+        
         # Invalidate from Redis if available
         if self.redis_available:
             try:
@@ -133,6 +203,9 @@ class RedisDomainCacheService:
     
     def clear_all_cache(self) -> None:
         """Clear all cached credentials"""
+        with self._local_lock:
+            self._local_cache.clear()
+        
         # Clear Redis cache if available
         if self.redis_available:
             try:
@@ -211,6 +284,28 @@ class RedisDomainCacheService:
         # Check in-memory cache
         return self.fallback_cache.is_domain_cached(domain)
     
+    def has_credentials(self, domain: str) -> bool:
+        """
+        Check if domain has cached credentials without fetching or deserializing them
+        
+        Args:
+            domain: Domain identifier
+            
+        Returns:
+            True if credentials are cached in any cache, False otherwise
+        """
+        if self._local_get(domain):
+            return True
+        
+        if self.redis_available:
+            try:
+                if redis_cache_service.has_domain_credentials(domain):
+                    return True
+            except Exception as e:
+                logger.error(f"Error checking Redis cache for domain {domain}: {str(e)}")
+        
+        return self.fallback_cache.is_domain_cached(domain)
+    
     def sync_cache_to_redis(self) -> int:
         """
         Sync in-memory cache to Redis (useful when Redis becomes available)
@@ -222,10 +317,9 @@ class RedisDomainCacheService:
             return 0
         
         synced_count = 0
-        memory_info = self.fallback_cache.get_cache_info()
         
         # Get all domains from memory cache
-        for domain in memory_info.get('cache_domains', []):
+        for domain in self.fallback_cache.get_cached_domains():
             try:
                 # Get credentials from memory cache
                 credentials = self.fallback_cache.get_credentials(domain)
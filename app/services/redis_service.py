@@ -2,7 +2,7 @@ import logging
 import json
 import time
 import hashlib
-from typing import Dict, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union
 from flask import current_app
 import redis
 from redis.connection import ConnectionPool
@@ -102,6 +102,31 @@ class RedisService:
                 logger.error(f"Error getting key {key} from Redis: {str(e)}")
                 return None
     
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values from Redis cache in a single MGET round-trip"""
+        if not keys:
+            return []
+        
+        with self.get_redis_client() as client:
+            if not client:
+                return [None] * len(keys)
+            
+            try:
+                values = []
+                for value in client.mget(keys):
+                    if value:
+                        # Try to deserialize JSON, fallback to string
+                        try:
+                            values.append(json.loads(value))
+                        except (json.JSONDecodeError, TypeError):
+                            values.append(value)
+                    else:
+                        values.append(None)
+                return values
+            except Exception as e:
+                logger.error(f"Error getting {len(keys)} keys from Redis: {str(e)}")
+                return [None] * len(keys)
+    
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set value in Redis cache"""
         with self.get_redis_client() as client:
@@ -211,19 +236,31 @@ class RedisCacheService:
         key = f"{current_app.config.get('REDIS_DOMAIN_CREDENTIALS_PREFIX', 'domain_creds:')}{domain}"
         return self.redis.get(key)
     
+    def get_domain_credentials_bulk(self, domains: List[str]) -> Dict[str, Optional[Dict[str, str]]]:
+        """Get cached credentials for several domains with one MGET"""
+        prefix = current_app.config.get('REDIS_DOMAIN_CREDENTIALS_PREFIX', 'domain_creds:')
+        values = self.redis.get_many([f"{prefix}{domain}" for domain in domains])
+        return dict(zip(domains, values))
+    
     def cache_domain_credentials(self, domain: str, credentials: Dict[str, str], ttl: Optional[int] = None) -> bool:
         """Cache domain credentials"""
         key = f"{current_app.config.get('REDIS_DOMAIN_CREDENTIALS_PREFIX', 'domain_creds:')}{domain}"
         if ttl is None:
             ttl = current_app.config.get('REDIS_CACHE_TTL', 3600)
         
-        return self.redis.set(key, credentials, ttl)
+        # Credentials may arrive as a read-only mapping; JSON needs a plain dict
+        return self.redis.set(key, dict(credentials), ttl)
     
     def invalidate_domain_credentials(self, domain: str) -> bool:
         """Invalidate cached domain credentials"""
         key = f"{current_app.config.get('REDIS_DOMAIN_CREDENTIALS_PREFIX', 'domain_creds:')}{domain}"
         return self.redis.delete(key)
     
+    def has_domain_credentials(self, domain: str) -> bool:
+        """Check if domain credentials are cached without fetching them"""
+        key = f"{current_app.config.get('REDIS_DOMAIN_CREDENTIALS_PREFIX', 'domain_creds:')}{domain}"
+        return self.redis.exists(key)
+    
     def get_user_session(self, user_id: str, domain: str) -> Optional[Dict[str, Any]]:
         """Get cached user session"""
         key = f"{current_app.config.get('REDIS_USER_SESSION_PREFIX', 'user_session:')}{domain}:{user_id}"
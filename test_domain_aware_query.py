@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Domain-aware query routing tests
+
+Checks that Model.query uses the request's domain session (g.db_session) when
+one is set, and the default db.session otherwise.
+"""
+
+from flask import Flask, g
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import db
+from app.models.user import User
+
+
+def _make_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    return app
+
+
+def test_query_uses_domain_session():
+    """User.query is bound to g.db_session inside a domain request"""
+    app = _make_app()
+    domain_session = sessionmaker(bind=create_engine('sqlite://'))()
+
+    with app.test_request_context('/'):
+        g.db_session = domain_session
+        assert User.query.session is domain_session
+
+    domain_session.close()
+
+
+def test_query_falls_back_to_default_session():
+    """User.query uses db.session when no domain session is set"""
+    app = _make_app()
+
+    with app.test_request_context('/'):
+        assert User.query.session is db.session()
+
+    with app.app_context():
+        assert User.query.session is db.session()
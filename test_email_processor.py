@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Email processor tests
+
+Covers value cleanup of extracted profile/requirement fields and batch
+profile saving.
+"""
+
+from contextlib import nullcontext
+
+from flask import Flask
+
+from app.database import db
+from app.models.profile import Profile
+from app.services.email_processor import EmailProcessor
+
+
+def _processor():
+    # The methods under test need no Graph/parser setup
+    return EmailProcessor.__new__(EmailProcessor)
+
+
+def test_clean_value_strips_closing_before_address_check():
+    """An early road/area word is kept when the PIN-like digits are in a stripped signature"""
+    processor = _processor()
+    assert processor._clean_value("Baner Road, Pune. Regards, Priya M: 9876543210") == "Baner Road, Pune."
+
+
+def test_clean_value_strips_disclaimer_before_address_check():
+    """A disclaimer is removed before the address pattern looks for a PIN code"""
+    processor = _processor()
+    assert processor._clean_value("Chennai area office. Disclaimer: call 600001") == "Chennai area office."
+
+
+def test_clean_value_strips_address_with_pin():
+    """An address followed by a PIN code is still removed"""
+    processor = _processor()
+    assert processor._clean_value("Pune 2nd Floor, Baner 411045") == "Pune 2nd"
+
+
+class _NoExistingProfiles:
+    """Profile.query stand-in for an empty profiles table"""
+
+    def filter(self, *criteria):
+        return self
+
+    def all(self):
+        return []
+
+
+class _RecordingSession:
+    """db.session stand-in that keeps what a batch would write"""
+
+    def __init__(self):
+        self.no_autoflush = nullcontext()
+        self.added = []
+
+    def add_all(self, profiles):
+        self.added.extend(profiles)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        raise AssertionError('batch save should not fall back to per-row saves')
+
+
+def test_batch_matches_profile_on_updated_keys(monkeypatch):
+    """A later row matches a profile on the email/contact an earlier row changed it to"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    session = _RecordingSession()
+    monkeypatch.setattr(Profile, 'query', _NoExistingProfiles())
+    monkeypatch.setattr(db, 'session', session)
+
+    processor = _processor()
+    student_ids = iter(['STU001', 'STU002', 'STU003'])
+    processor._generate_student_id = lambda: next(student_ids)
+    rows = [
+        {'candidate_name': 'Xavier Dsouza', 'email_id': 'x@x.com', 'contact_no': '9000000111'},
+        {'candidate_name': 'Yusuf Khan', 'email_id': 'y@x.com', 'contact_no': '9000000111'},
+        {'candidate_name': 'Zara Ali', 'email_id': 'x@x.com', 'contact_no': '9000000222'},
+    ]
+
+    with app.app_context():
+        saved = processor._create_or_update_profiles(rows, 'email-1')
+
+    # Yusuf updates Xavier's profile by contact, so Zara no longer matches it by email
+    assert [profile.student_id for profile in session.added] == ['STU001', 'STU002']
+    xavier, zara = session.added
+    assert saved == [xavier, xavier, zara]
+    assert (xavier.candidate_name, xavier.email_id, xavier.contact_no) == ('Xavier Dsouza', 'y@x.com', '9000000111')
+    assert (zara.candidate_name, zara.email_id, zara.contact_no) == ('Zara Ali', 'x@x.com', '9000000222')